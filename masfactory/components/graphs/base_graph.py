@@ -77,6 +77,7 @@ class BaseGraph(Node):
             Node: Created node instance.
         """
         name = kwargs.pop("name", None)
+        cv_snapshot = kwargs.pop("_cv_snapshot", None)
         if name is None and args and isinstance(args[0], str):
             name = args[0]
             args = args[1:]
@@ -125,6 +126,7 @@ class BaseGraph(Node):
                 name=name,
                 instantiate=_instantiate,
                 creation_path=tuple(creation_path),
+                _cv_snapshot=cv_snapshot,
                 **overrides,
             )
             
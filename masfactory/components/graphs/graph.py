@@ -7,7 +7,7 @@ from masfactory.components.graphs.base_graph import BaseGraph
 from masfactory.core.message import MessageFormatter,JsonMessageFormatter
 from masfactory.components.graphs.internal_nodes import InternalGraphNode
 from masfactory.utils.hook import masf_hook
-from masfactory.core.node_template import NodeTemplate
+from masfactory.core.node_template import NodeTemplate, _capture_template_cvars
 
 class Graph(BaseGraph):
     """
@@ -108,6 +108,9 @@ class Graph(BaseGraph):
             return
         # Create nodes from declarative `nodes` entries.
         if self._init_nodes:
+            # Snapshot the template ContextVars once for the whole batch; every node
+            # in this loop materializes under the same scoped defaults/overrides.
+            cv_snapshot = _capture_template_cvars()
             for item in self._init_nodes:
                 if len(item) < 2:
                     raise ValueError(f"Invalid node definition: {item}")
@@ -121,7 +124,10 @@ class Graph(BaseGraph):
                 # However, create_node(cls, *args, **kwargs) passes args/kwargs to constructor.
                 # So just passing *others is fine.
                 
-                self.create_node(target, *others, name=name)
+                if isinstance(target, NodeTemplate):
+                    self.create_node(target, *others, name=name, _cv_snapshot=cv_snapshot)
+                else:
+                    self.create_node(target, *others, name=name)
 
         # Create edges from declarative `edges` entries.
         if self._init_edges:
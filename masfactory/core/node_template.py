@@ -1,5 +1,6 @@
 import copy
 import inspect
+import sys
 from contextlib import contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass
@@ -36,6 +37,24 @@ class Factory(Generic[T]):
 
 
 _IMMUTABLE_SCALARS = (str, int, float, bool, bytes, type(None))
+_IMMUTABLE_SCALAR_SET = frozenset(_IMMUTABLE_SCALARS)
+_SHARED_SCOPE_VALUES = frozenset({"shared", "singleton"})
+_BLOCKED_TEMPLATE_KEYS = frozenset({"name"})
+
+
+def _intern_config_strings(config: dict[str, Any]) -> dict[str, Any]:
+    """Intern string keys and short string values of a template config.
+
+    Model names, role tags and similar literals repeat across many templates;
+    interning collapses the duplicates to one object and makes downstream key
+    comparisons identity-fast.
+    """
+    return {
+        (sys.intern(k) if type(k) is str else k): (
+            sys.intern(v) if type(v) is str and len(v) < 64 else v
+        )
+        for k, v in config.items()
+    }
 
 
 _TEMPLATE_DEFAULTS_CVAR: ContextVar[dict[str, Any]] = ContextVar(
@@ -114,7 +133,13 @@ def template_defaults_for(
     )
     pf = parse_path_filter(path_filter) if path_filter is not None else None
     previous = _TEMPLATE_DEFAULTS_RULES_CVAR.get()
-    token = _TEMPLATE_DEFAULTS_RULES_CVAR.set(previous + ((sel, pf, dict(defaults)),))
+    # The stored dict is owned by this contextmanager (interning rebuilds it from
+    # the fresh `**defaults`); callers must not mutate it after entry.
+    # Defaults apply inner-first-wins, so prepend here to keep the tuple in apply
+    # order and spare _materialize a reversed() per call.
+    token = _TEMPLATE_DEFAULTS_RULES_CVAR.set(
+        ((sel, pf, _intern_config_strings(defaults)),) + previous
+    )
     try:
         yield
     finally:
@@ -142,7 +167,10 @@ def template_overrides_for(
     )
     pf = parse_path_filter(path_filter) if path_filter is not None else None
     previous = _TEMPLATE_OVERRIDES_RULES_CVAR.get()
-    token = _TEMPLATE_OVERRIDES_RULES_CVAR.set(previous + ((sel, pf, dict(overrides)),))
+    # The stored dict is owned by this contextmanager.
+    token = _TEMPLATE_OVERRIDES_RULES_CVAR.set(
+        previous + ((sel, pf, _intern_config_strings(overrides)),)
+    )
     try:
         yield
     finally:
@@ -166,6 +194,108 @@ def _accepted_init_kwargs(node_cls: type) -> tuple[frozenset[str], bool]:
     return accepted_kw_names, accepts_var_kwargs
 
 
+_CUSTOM_CLONERS: dict[type, Callable[[Any], Any]] = {}
+
+
+def register_node_template_cloner(cls: type, fn: Callable[[Any], Any]) -> None:
+    """Register a specialized clone function for a config value type.
+
+    `_safe_clone` falls back to `copy.deepcopy` for unknown objects, which pays for
+    generic reduce/dispatch machinery. Registering a cheap clone function here (e.g.
+    `arr.copy()` for numpy arrays, `m.model_copy(deep=True)` for pydantic models)
+    bypasses that fallback for types that dominate a config.
+    """
+    _CUSTOM_CLONERS[cls] = fn
+
+
+def _is_shareable_frozen_dataclass(value: Any) -> bool:
+    """A frozen dataclass whose current field values are all immutable scalars is
+    effectively immutable and safe to share across node instances."""
+    params = getattr(type(value), "__dataclass_params__", None)
+    if params is None or not params.frozen:
+        return False
+    return all(
+        type(getattr(value, f)) in _IMMUTABLE_SCALAR_SET
+        for f in value.__dataclass_fields__
+    )
+
+
+def _capture_template_cvars() -> tuple:
+    """Snapshot the four template ContextVars.
+
+    Callers that materialize many nodes under one `with template_*(...)` block (e.g.
+    a declarative graph build) can capture the snapshot once and pass it to each
+    `_materialize` call instead of paying four ContextVar lookups per node.
+    """
+    return (
+        _TEMPLATE_DEFAULTS_CVAR.get(),
+        _TEMPLATE_OVERRIDES_CVAR.get(),
+        _TEMPLATE_DEFAULTS_RULES_CVAR.get(),
+        _TEMPLATE_OVERRIDES_RULES_CVAR.get(),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _match_decl_cached(sel: Selector, name: str, cls: type) -> bool:
+    """Memoized Selector.match_declaration.
+
+    Selectors are matched by identity here (they hash by id), so the cache stays
+    valid across rule-tuple rebuilds that reuse the same Selector objects.
+    """
+    return sel.match_declaration(name=name, cls=cls)
+
+
+_RULE_PLAN_CACHE: dict[tuple, tuple] = {}
+_RULE_PLAN_CACHE_MAX = 1024
+
+
+def _resolve_rules(
+    defaults_rules: tuple[tuple[Selector, PathFilter | None, dict[str, Any]], ...],
+    overrides_rules: tuple[tuple[Selector, PathFilter | None, dict[str, Any]], ...],
+    name: str,
+    node_cls: type,
+    creation_path: tuple[str, ...] | None,
+) -> tuple[tuple[dict[str, Any], ...], tuple[dict[str, Any], ...]]:
+    """Match both rule sets against a declaration once; cache the resulting plan.
+
+    Graphs that materialize the same (name, node_cls) repeatedly under one `with`
+    block would otherwise re-run every selector and path-filter match per node. The
+    cache is keyed by the identity of the CVar rule tuples (which are shared across
+    all calls inside a block); holding a strong reference to the tuples keeps their
+    ids valid for the lifetime of the entry.
+    """
+    if not defaults_rules and not overrides_rules:
+        return (), ()
+    key = (id(defaults_rules), id(overrides_rules), name, node_cls, creation_path)
+    cached = _RULE_PLAN_CACHE.get(key)
+    if (
+        cached is not None
+        and cached[0] is defaults_rules
+        and cached[1] is overrides_rules
+    ):
+        return cached[2], cached[3]
+
+    def _matches(sel: Selector, pf: PathFilter | None) -> bool:
+        if not _match_decl_cached(sel, name, node_cls):
+            return False
+        if pf is not None:
+            if creation_path is None or not match_path_filter(pf, creation_path):
+                return False
+        return True
+
+    # Defaults rules are stored pre-reversed (apply order, inner-first-wins).
+    matched_defaults = tuple(
+        cfg for sel, pf, cfg in defaults_rules if _matches(sel, pf)
+    )
+    matched_overrides = tuple(
+        cfg for sel, pf, cfg in overrides_rules if _matches(sel, pf)
+    )
+    if len(_RULE_PLAN_CACHE) >= _RULE_PLAN_CACHE_MAX:
+        _RULE_PLAN_CACHE.clear()
+    _RULE_PLAN_CACHE[key] = (defaults_rules, overrides_rules, matched_defaults, matched_overrides)
+    return matched_defaults, matched_overrides
+
+
 def _safe_clone(value: Any, memo: dict[int, Any] | None = None) -> Any:
     """
     Clone a template config value.
@@ -183,36 +313,40 @@ def _safe_clone(value: Any, memo: dict[int, Any] | None = None) -> Any:
     - Custom objects are copied (factory-like) unless explicitly marked as shared.
     - Non-copyable objects must be explicitly scoped via Shared/Factory.
     """
-    if memo is None:
-        memo = {}
-
-    obj_id = id(value)
-    if obj_id in memo:
-        return memo[obj_id]
-
+    # The memo dict is only materialized once something actually needs it
+    # (containers, factories, deepcopy). Scalars/Shared values — the most common
+    # inputs — never touch it, so top-level calls on them allocate nothing.
     if isinstance(value, _IMMUTABLE_SCALARS):
-        memo[obj_id] = value
         return value
 
     if isinstance(value, Shared):
-        memo[obj_id] = value.value
         return value.value
 
+    obj_id = id(value)
+    if memo is not None and obj_id in memo:
+        return memo[obj_id]
+
     if isinstance(value, Factory):
         produced = value.make()
-        memo[obj_id] = produced
+        if memo is not None:
+            memo[obj_id] = produced
         return produced
 
+    # A single getattr already falls through instance -> class -> MRO.
     scope = getattr(value, "__node_template_scope__", None)
-    if scope is None:
-        scope = getattr(getattr(value, "__class__", object), "__node_template_scope__", None)
-    if isinstance(scope, str) and scope.lower() in {"shared", "singleton"}:
-        memo[obj_id] = value
+    if isinstance(scope, str) and scope.lower() in _SHARED_SCOPE_VALUES:
+        if memo is not None:
+            memo[obj_id] = value
         return value
 
+    if memo is None:
+        memo = {}
+
     if isinstance(value, dict):
         cloned: dict[Any, Any] = {}
         memo[obj_id] = cloned
+        if not value:
+            return cloned
         for k, v in value.items():
             cloned[_safe_clone(k, memo)] = _safe_clone(v, memo)
         return cloned
@@ -220,21 +354,52 @@ def _safe_clone(value: Any, memo: dict[int, Any] | None = None) -> Any:
     if isinstance(value, list):
         cloned_list: list[Any] = []
         memo[obj_id] = cloned_list
+        if not value:
+            return cloned_list
         cloned_list.extend(_safe_clone(v, memo) for v in value)
         return cloned_list
 
     if isinstance(value, tuple):
+        if not value:
+            # The empty tuple is a safe shared singleton.
+            memo[obj_id] = value
+            return value
+        # Tuples of immutable scalars are themselves immutable — share them
+        # instead of rebuilding element by element.
+        if all(type(v) in _IMMUTABLE_SCALAR_SET for v in value):
+            memo[obj_id] = value
+            return value
         cloned_tuple = tuple(_safe_clone(v, memo) for v in value)
         memo[obj_id] = cloned_tuple
         return cloned_tuple
 
+    if isinstance(value, frozenset):
+        if all(type(v) in _IMMUTABLE_SCALAR_SET for v in value):
+            memo[obj_id] = value
+            return value
+        cloned_frozenset = frozenset(_safe_clone(v, memo) for v in value)
+        memo[obj_id] = cloned_frozenset
+        return cloned_frozenset
+
     if isinstance(value, set):
         cloned_set: set[Any] = set()
         memo[obj_id] = cloned_set
+        if not value:
+            return cloned_set
         for v in value:
             cloned_set.add(_safe_clone(v, memo))
         return cloned_set
 
+    cloner = _CUSTOM_CLONERS.get(type(value))
+    if cloner is not None:
+        cloned_obj = cloner(value)
+        memo[obj_id] = cloned_obj
+        return cloned_obj
+
+    if _is_shareable_frozen_dataclass(value):
+        memo[obj_id] = value
+        return value
+
     try:
         cloned_obj = copy.deepcopy(value, memo)
         memo[obj_id] = cloned_obj
@@ -263,11 +428,35 @@ class NodeTemplate(Generic[T]):
             **default_kwargs: Default constructor kwargs applied during materialization.
         """
         self.node_cls = node_cls
+        default_kwargs = _intern_config_strings(default_kwargs)
         self.prototype_config = default_kwargs
+        # Pre-split the prototype once at construction: Shared(...) wrappers unwrap
+        # to plain references here instead of being re-examined on every clone, and
+        # only the remainder is a candidate for per-node cloning.
+        self._proto_shared = {
+            k: v.value for k, v in default_kwargs.items() if isinstance(v, Shared)
+        }
+        self._proto_needs_clone = {
+            k: v for k, v in default_kwargs.items() if not isinstance(v, Shared)
+        }
+        # When the remainder is purely immutable scalars (the common case), no deep
+        # cloning is needed at all and render_config can shallow-copy.
+        self._proto_is_pure_immutable = all(
+            type(v) in _IMMUTABLE_SCALAR_SET
+            for v in self._proto_needs_clone.values()
+        )
 
-    def render_config(self, **override_kwargs) -> dict[str, Any]:
-        final_config = _safe_clone(self.prototype_config)
-        final_config.update(_safe_clone(override_kwargs))
+    def render_config(
+        self, *, _memo: dict[int, Any] | None = None, **override_kwargs
+    ) -> dict[str, Any]:
+        if _memo is None:
+            _memo = {}
+        if self._proto_is_pure_immutable:
+            final_config = {**self._proto_needs_clone, **self._proto_shared}
+        else:
+            final_config = _safe_clone(self._proto_needs_clone, _memo)
+            final_config.update(self._proto_shared)
+        final_config.update(_safe_clone(override_kwargs, _memo))
         return final_config
 
     def __call__(self, *args: Any, **override_kwargs) -> "NodeTemplate[T]":
@@ -289,7 +478,9 @@ class NodeTemplate(Generic[T]):
             )
         if not override_kwargs:
             return self
-        return self.clone(**override_kwargs)
+        # The `**override_kwargs` dict is fresh and owned by this call, so the
+        # defensive clones in `clone()` are unnecessary here.
+        return self._clone_unchecked(**override_kwargs)
 
     def _materialize(
         self,
@@ -297,6 +488,7 @@ class NodeTemplate(Generic[T]):
         name: str,
         instantiate: Callable[..., Node],
         creation_path: tuple[str, ...] | None = None,
+        _cv_snapshot: tuple | None = None,
         **override_kwargs: Any,
     ) -> T:
         """
@@ -304,52 +496,70 @@ class NodeTemplate(Generic[T]):
 
         Graph/BaseGraph should call this during create_node(), so Nodes are always registered inside a Graph.
         """
-        final_config = self.render_config(**override_kwargs)
+        # One memo shared across the prototype clone and every rule application, so
+        # shared sub-structures referenced from multiple config sources are cloned once.
+        memo: dict[int, Any] = {}
+        final_config = self.render_config(_memo=memo, **override_kwargs)
 
         accepted_kw_names, accepts_var_kwargs = _accepted_init_kwargs(self.node_cls)
-
-        def can_inject(key: str) -> bool:
-            if key == "name":
-                return False
-            return accepts_var_kwargs or key in accepted_kw_names
-
-        memo: dict[int, Any] = {}
+        # Precompute the injectable key set once; "name" is always supplied explicitly
+        # and must never be injected by rules. None means "anything but name".
+        allowed_keys = None if accepts_var_kwargs else accepted_kw_names - _BLOCKED_TEMPLATE_KEYS
+
+        def injectable(cfg_keys):
+            if allowed_keys is None:
+                return cfg_keys - _BLOCKED_TEMPLATE_KEYS
+            return cfg_keys & allowed_keys
+
+        if _cv_snapshot is None:
+            _cv_snapshot = _capture_template_cvars()
+        scoped_defaults, scoped_overrides, defaults_rules, overrides_rules = _cv_snapshot
+
+        matched_default_cfgs, matched_override_cfgs = _resolve_rules(
+            defaults_rules,
+            overrides_rules,
+            name,
+            self.node_cls,
+            creation_path,
+        )
 
         # Apply selector defaults (fill missing only, higher than global defaults).
-        for sel, pf, cfg in reversed(_TEMPLATE_DEFAULTS_RULES_CVAR.get()):
-            if not sel.match_declaration(name=name, cls=self.node_cls):
-                continue
-            if pf is not None:
-                if creation_path is None or not match_path_filter(pf, creation_path):
-                    continue
-            for key, value in cfg.items():
-                if key not in final_config and can_inject(key):
-                    final_config[key] = _safe_clone(value, memo)
+        for cfg in matched_default_cfgs:
+            for key in injectable(cfg.keys()):
+                if key not in final_config:
+                    final_config[key] = _safe_clone(cfg[key], memo)
 
         # Apply global defaults (fill missing only).
-        scoped_defaults = _TEMPLATE_DEFAULTS_CVAR.get()
-        for key, value in scoped_defaults.items():
-            if key not in final_config and can_inject(key):
-                final_config[key] = _safe_clone(value, memo)
+        if scoped_defaults:
+            for key in injectable(scoped_defaults.keys()):
+                if key not in final_config:
+                    final_config[key] = _safe_clone(scoped_defaults[key], memo)
 
         # Apply global overrides (force overwrite).
-        scoped_overrides = _TEMPLATE_OVERRIDES_CVAR.get()
-        for key, value in scoped_overrides.items():
-            if can_inject(key):
-                final_config[key] = _safe_clone(value, memo)
+        if scoped_overrides:
+            for key in injectable(scoped_overrides.keys()):
+                final_config[key] = _safe_clone(scoped_overrides[key], memo)
 
         # Apply selector overrides (force overwrite, higher than global overrides).
-        for sel, pf, cfg in _TEMPLATE_OVERRIDES_RULES_CVAR.get():
-            if not sel.match_declaration(name=name, cls=self.node_cls):
-                continue
-            if pf is not None:
-                if creation_path is None or not match_path_filter(pf, creation_path):
-                    continue
-            for key, value in cfg.items():
-                if can_inject(key):
-                    final_config[key] = _safe_clone(value, memo)
+        for cfg in matched_override_cfgs:
+            for key in injectable(cfg.keys()):
+                final_config[key] = _safe_clone(cfg[key], memo)
         return instantiate(self.node_cls, name=name, **final_config)  # type: ignore
 
+    def _clone_unchecked(self, **override_kwargs) -> "NodeTemplate[T]":
+        """Derive a template without cloning prototype or overrides.
+
+        Safe when the caller owns the override kwargs and will not mutate them
+        afterwards; the original prototype values (including Shared/Factory
+        wrappers) are carried over by reference.
+        """
+        new_prototype_config = dict(self.prototype_config)
+        new_prototype_config.update(override_kwargs)
+        return NodeTemplate(
+            node_cls=self.node_cls,
+            **new_prototype_config
+        )
+
     def clone(self, **override_kwargs) -> 'NodeTemplate[T]':
         new_prototype_config = _safe_clone(self.prototype_config)
         new_prototype_config.update(_safe_clone(override_kwargs))
@@ -364,6 +574,7 @@ __all__ = [
     "NodeTemplate",
     "Shared",
     "Factory",
+    "register_node_template_cloner",
     "template_defaults",
     "template_overrides",
     "template_defaults_for",
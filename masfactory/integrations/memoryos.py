@@ -46,15 +46,13 @@ class MemoryOSMemory(Memory):
         self._update_fn = update_fn
         self._delete_fn = delete_fn
         self._reset_fn = reset_fn
-        self._keys = {
-            "text": text_key,
-            "uri": uri_key,
-            "chunk_id": chunk_id_key,
-            "score": score_key,
-            "title": title_key,
-            "metadata": metadata_key,
-            "dedupe_key": dedupe_key_key,
-        }
+        self._text_key = text_key
+        self._uri_key = uri_key
+        self._chunk_id_key = chunk_id_key
+        self._score_key = score_key
+        self._title_key = title_key
+        self._metadata_key = metadata_key
+        self._dedupe_key_key = dedupe_key_key
 
     def insert(self, key: str, value: str):
         if self._insert_fn is None:
@@ -76,21 +74,32 @@ class MemoryOSMemory(Memory):
             self._reset_fn()
 
     def get_blocks(self, query: ContextQuery, *, top_k: int = 8) -> list[ContextBlock]:
-        items = list(self._retrieve(query, int(top_k)))
+        k = top_k if type(top_k) is int else int(top_k)
+        text_key = self._text_key
+        uri_key = self._uri_key
+        chunk_id_key = self._chunk_id_key
+        score_key = self._score_key
+        title_key = self._title_key
+        metadata_key = self._metadata_key
+        dedupe_key_key = self._dedupe_key_key
         blocks: list[ContextBlock] = []
-        for item in items:
-            text = item.get(self._keys["text"])
+        append = blocks.append
+        for item in self._retrieve(query, k):
+            get = item.get
+            text = get(text_key)
             if not isinstance(text, str) or not text.strip():
                 continue
-            blocks.append(
+            # Positional construction (field order matches ContextBlock) avoids the
+            # kwargs dict build per block in this hot loop.
+            append(
                 ContextBlock(
-                    text=text,
-                    uri=item.get(self._keys["uri"]),
-                    chunk_id=item.get(self._keys["chunk_id"]),
-                    score=item.get(self._keys["score"]),
-                    title=item.get(self._keys["title"]),
-                    metadata=item.get(self._keys["metadata"]) or {},
-                    dedupe_key=item.get(self._keys["dedupe_key"]),
+                    text,
+                    get(uri_key),
+                    get(chunk_id_key),
+                    get(score_key),
+                    get(title_key),
+                    get(metadata_key) or {},
+                    get(dedupe_key_key),
                 )
             )
         return blocks
@@ -1,4 +1,7 @@
 from typing import Callable, Dict, List, Union, Optional
+import asyncio
+import concurrent.futures
+import functools
 import importlib.util
 import numpy as np
 import os
@@ -6,11 +9,31 @@ import json
 import re
 from abc import ABC, abstractmethod
 
-# Optional dependency availability flags (backward-compatible with earlier versions).
-OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
-SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
-ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
-SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
+@functools.lru_cache(maxsize=None)
+def _has(pkg: str) -> bool:
+    """Probe (once) whether an optional dependency is importable.
+
+    `find_spec` walks `sys.path`, so deferring and caching the probes keeps
+    module import free of filesystem work; constructors still raise their own
+    ImportError with install instructions when the dependency is missing.
+    """
+    return importlib.util.find_spec(pkg) is not None
+
+
+# Backward-compatible availability flags, resolved lazily on first access.
+_AVAILABILITY_FLAGS = {
+    "OPENAI_AVAILABLE": "openai",
+    "SENTENCE_TRANSFORMERS_AVAILABLE": "sentence_transformers",
+    "ANTHROPIC_AVAILABLE": "anthropic",
+    "SKLEARN_AVAILABLE": "sklearn",
+}
+
+
+def __getattr__(name):
+    pkg = _AVAILABILITY_FLAGS.get(name)
+    if pkg is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _has(pkg)
 
 class BaseEmbedder(ABC):
     """Abstract embedder interface.
@@ -18,26 +41,166 @@ class BaseEmbedder(ABC):
     Implementations return a callable that maps text to an `np.ndarray` embedding vector.
     """
 
-    def __init__(self):
-        pass
-    
+    def __init__(self, cache_size: int = 0):
+        """Initialize shared embedder state.
+
+        Args:
+            cache_size: If > 0, scalar embedding functions are memoized on the
+                text with an LRU cache of this size. Disabled by default to
+                avoid surprise memory growth.
+        """
+        self.cache_size = cache_size
+        self._caches: list = []
+        self._cached_embedding_function: Optional[Callable[[str], np.ndarray]] = None
+
     @abstractmethod
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
         """Return a callable that maps text to an embedding vector."""
         pass
-    
+
+    def _maybe_cache(
+        self, embedding_function: Callable[[str], np.ndarray]
+    ) -> Callable[[str], np.ndarray]:
+        """Wrap a scalar embedding function with an LRU cache when enabled.
+
+        The wrapper is built once per instance and reused on later calls:
+        each embedder exposes a single scalar function, and the base
+        `embed_batch` calls `get_embedding_function()` per batch, so building
+        a fresh cache each time would discard every memoized entry between
+        batches (and pile up dead cache objects in `_caches`).
+
+        Cached arrays are returned as copies so callers cannot mutate the
+        shared cache entries.
+        """
+        if not self.cache_size:
+            return embedding_function
+        if self._cached_embedding_function is not None:
+            return self._cached_embedding_function
+
+        cached = functools.lru_cache(maxsize=self.cache_size)(embedding_function)
+        self._caches.append(cached)
+
+        def cached_embedding_function(text: str) -> np.ndarray:
+            return cached(text).copy()
+
+        self._cached_embedding_function = cached_embedding_function
+        return cached_embedding_function
+
+    def clear_cache(self):
+        """Drop all memoized embeddings."""
+        for cached in self._caches:
+            cached.cache_clear()
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts at once, one row per text.
+
+        Subclasses with a native batch path (batched model inference, list-input
+        APIs) override this; the default falls back to the scalar function.
+        """
+        embedding_function = self.get_embedding_function()
+        return np.array([embedding_function(text) for text in texts])
+
+def _has_single_char_tokens(documents: List[str], sample: int = 32) -> bool:
+    """Heuristic: does the corpus contain 1-char tokens?
+
+    sklearn's default token_pattern drops them, which can yield an empty
+    vocabulary; detecting this upfront lets the vectorizer pick the permissive
+    pattern on the first fit instead of fitting twice.
+    """
+    for doc in documents[:sample]:
+        for token in doc.split():
+            if len(token) == 1:
+                return True
+    return False
+
+
+class _SharedVectorizerState:
+    """One tokenizer + vocabulary shared by the sklearn-backed embedders.
+
+    A single fitted `CountVectorizer` provides term counts; a lazily fitted
+    `TfidfTransformer` on top derives TF-IDF rows by IDF-scaling the same
+    count CSR. When a pipeline uses both `TfidfEmbedder` and
+    `BagOfWordsEmbedder` on one corpus, sharing this state means the corpus
+    is tokenized once and the vocabulary is stored once.
+    """
+
+    def __init__(self, documents: List[str], max_features: int = 5000):
+        try:
+            from sklearn.feature_extraction.text import CountVectorizer
+        except ImportError:
+            raise ImportError("scikit-learn is not installed. Please install it using 'pip install scikit-learn'")
+
+        self.documents = documents or []
+        self.max_features = max_features
+
+        vectorizer_kwargs = {"max_features": max_features, "dtype": np.float32}
+        if self.documents and _has_single_char_tokens(self.documents):
+            vectorizer_kwargs["token_pattern"] = r"(?u)\b\w+\b"
+        self.count = CountVectorizer(**vectorizer_kwargs)
+
+        self._fit_counts = None
+        self._tfidf = None
+        if self.documents:
+            try:
+                self._fit_counts = self.count.fit_transform(self.documents)
+            except ValueError as e:
+                if "empty vocabulary" not in str(e).lower():
+                    raise
+                self.count = CountVectorizer(
+                    max_features=max_features,
+                    dtype=np.float32,
+                    token_pattern=r"(?u)\b\w+\b",
+                )
+                self._fit_counts = self.count.fit_transform(self.documents)
+
+    @property
+    def tfidf(self):
+        """Lazily fitted `TfidfTransformer` over the shared count matrix."""
+        if self._tfidf is None:
+            from sklearn.feature_extraction.text import TfidfTransformer
+
+            self._tfidf = TfidfTransformer()
+            self._tfidf.fit(self._fit_counts)
+        return self._tfidf
+
+    def transform_counts(self, texts: List[str]):
+        """Term-count CSR rows for `texts` (one tokenization pass)."""
+        return self.count.transform(texts)
+
+    def transform_tfidf(self, texts: List[str]):
+        """TF-IDF CSR rows derived from the shared counts via IDF scaling."""
+        return self.tfidf.transform(self.count.transform(texts), copy=False)
+
+
 class TfidfEmbedder(BaseEmbedder):
     """TF-IDF embedder backed by scikit-learn."""
 
-    def __init__(self, documents: List[str] = None, max_features: int = 5000):
+    def __init__(
+        self,
+        documents: List[str] = None,
+        max_features: int = 5000,
+        cache_size: int = 0,
+        shared_state: "_SharedVectorizerState | None" = None,
+    ):
         """Create a TF-IDF embedder.
 
         Args:
             documents: Optional seed documents used to fit the vectorizer.
             max_features: Maximum vocabulary size.
+            cache_size: Optional LRU size for memoizing repeated texts.
+            shared_state: Optional shared tokenizer/vocabulary; when given, no
+                separate vectorizer is fit and `documents`/`max_features` are
+                taken from it.
         """
-        super().__init__()
-        
+        super().__init__(cache_size)
+
+        self._shared = shared_state
+        if shared_state is not None:
+            self.documents = shared_state.documents
+            self.max_features = shared_state.max_features
+            self.vectorizer = shared_state.count
+            return
+
         try:
             from sklearn.feature_extraction.text import TfidfVectorizer
         except ImportError:
@@ -46,42 +209,86 @@ class TfidfEmbedder(BaseEmbedder):
         self.documents = documents or []
         self.max_features = max_features
         
-        self.vectorizer = TfidfVectorizer(max_features=max_features)
-        
+        vectorizer_kwargs = {"max_features": max_features, "dtype": np.float32}
+        if self.documents and _has_single_char_tokens(self.documents):
+            # sklearn default token_pattern ignores 1-char tokens, which can yield an
+            # empty vocabulary for corpora like ["a b", "a c"]. Picking the permissive
+            # pattern upfront avoids fitting twice.
+            vectorizer_kwargs["token_pattern"] = r"(?u)\b\w+\b"
+        self.vectorizer = TfidfVectorizer(**vectorizer_kwargs)
+
         if self.documents:
             try:
                 self.vectorizer.fit(self.documents)
             except ValueError as e:
-                # sklearn default token_pattern ignores 1-char tokens, which can yield an empty vocabulary
-                # for corpora like ["a b", "a c"]. Retry with a more permissive token_pattern.
+                # Safety net for corpora the sampling heuristic missed.
                 if "empty vocabulary" not in str(e).lower():
                     raise
                 self.vectorizer = TfidfVectorizer(
                     max_features=max_features,
+                    dtype=np.float32,
                     token_pattern=r"(?u)\b\w+\b",
                 )
                 self.vectorizer.fit(self.documents)
 
+    def _transform(self, texts: List[str]):
+        if self._shared is not None:
+            return self._shared.transform_tfidf(texts)
+        return self.vectorizer.transform(texts)
+
+    def _use_shared(self, shared_state: "_SharedVectorizerState"):
+        """Rebind onto a shared tokenizer/vocabulary, dropping the private one."""
+        self._shared = shared_state
+        self.vectorizer = shared_state.count
+
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
         def embedding_function(text: str) -> np.ndarray:
-            vector = self.vectorizer.transform([text]).toarray()[0]
-            
-            return vector
-        
-        return embedding_function
+            return self._transform([text]).toarray().ravel()
+
+        return self._maybe_cache(embedding_function)
+
+    def embed_batch(self, texts: List[str]):
+        """Vectorize all texts in one transform call.
+
+        Returns the CSR matrix from the vectorizer directly; rows are >99% zeros
+        for typical vocabularies, so consumers should densify only at the final
+        step (if at all).
+        """
+        return self._transform(texts)
+
+    def embed_sparse(self, texts: List[str]):
+        """Vectorize texts and return the sparse (CSR) rows."""
+        return self._transform(texts)
 
 class BagOfWordsEmbedder(BaseEmbedder):
     """Bag-of-words embedder backed by scikit-learn."""
 
-    def __init__(self, documents: List[str] = None, max_features: int = 5000):
+    def __init__(
+        self,
+        documents: List[str] = None,
+        max_features: int = 5000,
+        cache_size: int = 0,
+        shared_state: "_SharedVectorizerState | None" = None,
+    ):
         """Create a bag-of-words embedder.
 
         Args:
             documents: Optional seed documents used to fit the vectorizer.
             max_features: Maximum vocabulary size.
+            cache_size: Optional LRU size for memoizing repeated texts.
+            shared_state: Optional shared tokenizer/vocabulary; when given, no
+                separate vectorizer is fit (counts come back float32 rather
+                than int32 since the shared matrix also feeds TF-IDF).
         """
-        super().__init__()
-        
+        super().__init__(cache_size)
+
+        self._shared = shared_state
+        if shared_state is not None:
+            self.documents = shared_state.documents
+            self.max_features = shared_state.max_features
+            self.vectorizer = shared_state.count
+            return
+
         try:
             from sklearn.feature_extraction.text import CountVectorizer
         except ImportError:
@@ -90,8 +297,11 @@ class BagOfWordsEmbedder(BaseEmbedder):
         self.documents = documents or []
         self.max_features = max_features
         
-        self.vectorizer = CountVectorizer(max_features=max_features)
-        
+        vectorizer_kwargs = {"max_features": max_features, "dtype": np.int32}
+        if self.documents and _has_single_char_tokens(self.documents):
+            vectorizer_kwargs["token_pattern"] = r"(?u)\b\w+\b"
+        self.vectorizer = CountVectorizer(**vectorizer_kwargs)
+
         if self.documents:
             try:
                 self.vectorizer.fit(self.documents)
@@ -100,58 +310,134 @@ class BagOfWordsEmbedder(BaseEmbedder):
                     raise
                 self.vectorizer = CountVectorizer(
                     max_features=max_features,
+                    dtype=np.int32,
                     token_pattern=r"(?u)\b\w+\b",
                 )
                 self.vectorizer.fit(self.documents)
     
+    def _transform(self, texts: List[str]):
+        if self._shared is not None:
+            return self._shared.transform_counts(texts)
+        return self.vectorizer.transform(texts)
+
+    def _use_shared(self, shared_state: "_SharedVectorizerState"):
+        """Rebind onto a shared tokenizer/vocabulary, dropping the private one."""
+        self._shared = shared_state
+        self.vectorizer = shared_state.count
+
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
-        def embedding_function(text: str) -> np.ndarray:            
-            vector = self.vectorizer.transform([text]).toarray()[0]
-            
-            return vector
-        
-        return embedding_function
+        def embedding_function(text: str) -> np.ndarray:
+            return self._transform([text]).toarray().ravel()
+
+        return self._maybe_cache(embedding_function)
+
+    def embed_batch(self, texts: List[str]):
+        """Vectorize all texts in one transform call, returning sparse rows."""
+        return self._transform(texts)
+
+    def embed_sparse(self, texts: List[str]):
+        """Vectorize texts and return the sparse (CSR) rows."""
+        return self._transform(texts)
 
 class SentenceTransformerEmbedder(BaseEmbedder):
     """Embedder backed by `sentence-transformers`."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        batch_size: int = 32,
+        cache_size: int = 0,
+        device: str = "auto",
+        fp16: bool = True,
+        normalize_embeddings: bool = False,
+    ):
         """Create a sentence-transformers embedder.
 
         Args:
             model_name: SentenceTransformer model identifier.
+            batch_size: Batch size used by `embed_batch`.
+            cache_size: Optional LRU size for memoizing repeated texts.
+            device: Torch device; "auto" picks cuda, then mps, then cpu.
+            fp16: Run the model in half precision on CUDA devices.
+            normalize_embeddings: Return unit-norm vectors so downstream cosine
+                similarity reduces to a dot product.
         """
-        super().__init__()
-        
+        super().__init__(cache_size)
+
         try:
             from sentence_transformers import SentenceTransformer
+            import torch
         except ImportError:
             raise ImportError("sentence-transformers is not installed. Please install it using 'pip install sentence-transformers'")
-        
+
+        if device == "auto":
+            if torch.cuda.is_available():
+                device = "cuda"
+            elif torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = "cpu"
+
         self.model_name = model_name
-        
-        self.model = SentenceTransformer(model_name)
-    
+        self.batch_size = batch_size
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+
+        self.model = SentenceTransformer(model_name, device=device)
+        if fp16 and device.startswith("cuda"):
+            self.model.half()
+
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
         def embedding_function(text: str) -> np.ndarray:
-            embedding = self.model.encode(text)
-            
+            embedding = self.embed_batch([text])[0]
+
             return embedding
-        
-        return embedding_function
+
+        return self._maybe_cache(embedding_function)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode all texts in one batched `model.encode` call.
+
+        A single batched call amortizes tokenization and kernel-launch overhead
+        that per-text `encode` calls pay repeatedly. Inputs are length-sorted
+        before encoding ("smart batching") so each batch pads to similar lengths,
+        then the rows are un-permuted back to input order.
+        """
+        if len(texts) <= 1:
+            return self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=self.normalize_embeddings,
+                show_progress_bar=False,
+            ).astype(np.float32, copy=False)
+        order = np.argsort([len(text.split()) for text in texts])
+        sorted_texts = [texts[i] for i in order]
+        sorted_embeddings = self.model.encode(
+            sorted_texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize_embeddings,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
 
 class OpenAIEmbedder(BaseEmbedder):
     """Embedder backed by the OpenAI embeddings API."""
 
-    def __init__(self, model: str = "text-embedding-3-small", api_key: str = None, **kwargs):
+    def __init__(self, model: str = "text-embedding-3-small", api_key: str = None, cache_size: int = 0, **kwargs):
         """Create an OpenAI embedder.
 
         Args:
             model: Embedding model identifier.
             api_key: Optional OpenAI API key.
+            cache_size: Optional LRU size for memoizing repeated texts; a hit
+                turns an API round trip into a local lookup.
             **kwargs: Extra kwargs forwarded to the OpenAI client constructor.
         """
-        super().__init__()
+        super().__init__(cache_size)
         
         try:
             import openai
@@ -159,8 +445,10 @@ class OpenAIEmbedder(BaseEmbedder):
             raise ImportError("openai is not installed. Please install it using 'pip install openai'")
         
         self.model = model
-        
+
         self.client = openai.OpenAI(api_key=api_key, **kwargs)
+        # aembed_batch builds its async client per call from these kwargs.
+        self._client_kwargs = {"api_key": api_key, **kwargs}
     
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
         def embedding_function(text: str) -> np.ndarray:
@@ -169,13 +457,82 @@ class OpenAIEmbedder(BaseEmbedder):
                     model=self.model,
                     input=text
                 )
-                embedding = np.array(response.data[0].embedding)
-                
+                # float32: the API returns ~7 significant digits, so float64
+                # only doubles downstream memory and bandwidth.
+                embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+
                 return embedding
             except Exception as e:
                 raise RuntimeError(f"Failed to generate OpenAI embedding: {e}") from e
-        
-        return embedding_function
+
+        return self._maybe_cache(embedding_function)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed all texts in one API call using the list-input form."""
+        try:
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=list(texts)
+            )
+            return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate OpenAI embeddings: {e}") from e
+
+    async def aembed_batch(
+        self,
+        texts: List[str],
+        chunk_size: int = 1000,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+    ) -> np.ndarray:
+        """Embed many texts with concurrent list-input API calls.
+
+        Texts are split into chunks of `chunk_size` (one HTTP round trip each)
+        and the chunks run concurrently under a semaphore, with exponential
+        backoff on rate limits and transient server errors. For bulk ingest this
+        turns thousands of serial round trips into a handful of parallel ones.
+
+        The async client lives for exactly one call: its connection pool and
+        sync primitives bind to the running event loop, and the
+        `embed_batch_concurrent` wrapper spins up a fresh loop per call via
+        `asyncio.run`, so a cached client would break on the second call with
+        "Event loop is closed".
+        """
+        import openai
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async with openai.AsyncOpenAI(**self._client_kwargs) as aclient:
+
+            async def embed_chunk(chunk: List[str]) -> list:
+                async with semaphore:
+                    for attempt in range(max_retries):
+                        try:
+                            response = await aclient.embeddings.create(
+                                model=self.model,
+                                input=chunk
+                            )
+                            return [item.embedding for item in response.data]
+                        except Exception as e:
+                            status_code = getattr(e, "status_code", None)
+                            retryable_status = {429, 500, 502, 503, 504}
+                            if status_code not in retryable_status and status_code is not None:
+                                raise
+                            if attempt == max_retries - 1:
+                                raise
+                            await asyncio.sleep(retry_base_delay * (2 ** attempt))
+
+            chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+        return np.asarray(
+            [embedding for chunk_result in results for embedding in chunk_result],
+            dtype=np.float32,
+        )
+
+    def embed_batch_concurrent(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Synchronous wrapper around `aembed_batch`."""
+        return asyncio.run(self.aembed_batch(texts, **kwargs))
 
 class AnthropicEmbedder(BaseEmbedder):
     """Placeholder embedder for Anthropic.
@@ -214,14 +571,15 @@ class AnthropicEmbedder(BaseEmbedder):
 class HybridEmbedder(BaseEmbedder):
     """Embedder that combines multiple embedders into one vector."""
 
-    def __init__(self, embedders: List[BaseEmbedder], weights: List[float] = None):
+    def __init__(self, embedders: List[BaseEmbedder], weights: List[float] = None, cache_size: int = 0):
         """Create a HybridEmbedder.
 
         Args:
             embedders: List of embedders to combine.
             weights: Optional weights aligned with `embedders`.
+            cache_size: Optional LRU size for memoizing the combined vector.
         """
-        super().__init__()
+        super().__init__(cache_size)
         
         self.embedders = embedders
         
@@ -234,36 +592,109 @@ class HybridEmbedder(BaseEmbedder):
             raise ValueError("Number of weights must match number of embedders")
         
         self.embedding_functions = [embedder.get_embedding_function() for embedder in embedders]
-    
+        self._maybe_share_vectorizers()
+
+        # Sub-embedders are independent and typically a mix of I/O-bound (HTTP),
+        # GPU-bound and numpy-bound work, all of which release the GIL — fan
+        # them out on a small thread pool so latency is max(T_i), not sum(T_i).
+        self._pool = (
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(embedders), thread_name_prefix="hybrid-embed"
+            )
+            if len(embedders) > 1
+            else None
+        )
+
+    def _maybe_share_vectorizers(self):
+        """Point TF-IDF and bag-of-words sub-embedders at one shared vocabulary.
+
+        When both were fit independently over the same corpus with the same
+        `max_features`, rebuilding a `_SharedVectorizerState` once lets their
+        private vectorizers be dropped: one vocabulary in memory and one
+        tokenization pass per transform instead of two.
+        """
+        tfidf_embedders = [
+            e for e in self.embedders if isinstance(e, TfidfEmbedder) and e._shared is None
+        ]
+        bow_embedders = [
+            e for e in self.embedders if isinstance(e, BagOfWordsEmbedder) and e._shared is None
+        ]
+        for tfidf_embedder in tfidf_embedders:
+            for bow_embedder in bow_embedders:
+                if bow_embedder._shared is not None:
+                    continue
+                if (
+                    tfidf_embedder.documents
+                    and tfidf_embedder.max_features == bow_embedder.max_features
+                    and (
+                        tfidf_embedder.documents is bow_embedder.documents
+                        or tfidf_embedder.documents == bow_embedder.documents
+                    )
+                ):
+                    shared = _SharedVectorizerState(
+                        tfidf_embedder.documents, tfidf_embedder.max_features
+                    )
+                    tfidf_embedder._use_shared(shared)
+                    bow_embedder._use_shared(shared)
+                    break
+
+    def _combine(self, embeddings: List[np.ndarray]) -> np.ndarray:
+        # Fill one preallocated float32 output instead of concatenating float64
+        # intermediates: half the bytes and no temporary per sub-embedding.
+        sizes = [emb.size for emb in embeddings]
+        out = np.empty(sum(sizes), dtype=np.float32)
+        offset = 0
+        for weight, emb, size in zip(self.weights, embeddings, sizes):
+            block = out[offset:offset + size]
+            np.multiply(emb, weight / (np.linalg.norm(emb) + 1e-12), out=block)
+            offset += size
+        return out
+
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
         """Return a callable that produces a combined embedding vector."""
         def embedding_function(text: str) -> np.ndarray:
-            embeddings = []
-            embedding_dims = []
-            
-            for func in self.embedding_functions:
-                embedding = func(text)
-                embeddings.append(embedding)
-                embedding_dims.append(len(embedding))
-            
-            # combined = np.concatenate(embeddings)
-            
-            normalized_embeddings = []
-            for i, emb in enumerate(embeddings):
-                norm_emb = emb / np.linalg.norm(emb)
-                weighted_emb = norm_emb * self.weights[i]
-                normalized_embeddings.append(weighted_emb)
-            
-            combined_dict = {}
-            for i, emb in enumerate(normalized_embeddings):
-                for j, val in enumerate(emb):
-                    combined_dict[f"emb{i}_dim{j}"] = val
-            
-            combined = np.array(list(combined_dict.values()))
-            
-            return combined
-        
-        return embedding_function
+            if self._pool is None:
+                return self._combine([func(text) for func in self.embedding_functions])
+            futures = [self._pool.submit(func, text) for func in self.embedding_functions]
+            return self._combine([future.result() for future in futures])
+
+        return self._maybe_cache(embedding_function)
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """Async variant of the combined embedding; sub-embedders run concurrently."""
+        embeddings = await asyncio.gather(
+            *(asyncio.to_thread(func, text) for func in self.embedding_functions)
+        )
+        return self._combine(list(embeddings))
+
+    def embed_batch(self, texts: List[str]):
+        """Combine sub-embedder batches row-wise.
+
+        Sparse blocks (TF-IDF / bag-of-words CSR rows) are normalized and stacked
+        without ever densifying; the result is sparse if any block is sparse.
+        """
+        blocks = [embedder.embed_batch(texts) for embedder in self.embedders]
+
+        if any(hasattr(block, "tocsr") for block in blocks):
+            from scipy.sparse import hstack, issparse
+            from sklearn.preprocessing import normalize
+
+            normalized_blocks = []
+            for weight, block in zip(self.weights, blocks):
+                if issparse(block):
+                    normalized_blocks.append(normalize(block, norm="l2", copy=False) * weight)
+                else:
+                    norms = np.linalg.norm(block, axis=1, keepdims=True) + 1e-12
+                    normalized_blocks.append(weight * (block / norms))
+            return hstack(normalized_blocks).tocsr()
+
+        normalized_blocks = [
+            (weight * (block / (np.linalg.norm(block, axis=1, keepdims=True) + 1e-12))).astype(
+                np.float32, copy=False
+            )
+            for weight, block in zip(self.weights, blocks)
+        ]
+        return np.concatenate(normalized_blocks, axis=1)
 
 class SimpleEmbedder(BaseEmbedder):
     """Very simple hashing-based embedder.
@@ -271,27 +702,32 @@ class SimpleEmbedder(BaseEmbedder):
     This is intended for lightweight demos and tests, not for high-quality retrieval.
     """
 
-    def __init__(self, vocab_size: int = 10000):
+    def __init__(self, vocab_size: int = 10000, cache_size: int = 4096):
         """Create a SimpleEmbedder.
 
         Args:
             vocab_size: Size of the hashing vocabulary / embedding dimension.
+            cache_size: LRU size for memoizing repeated texts (on by default;
+                vectors here are small and cheap to keep).
         """
-        super().__init__()
-        
+        super().__init__(cache_size)
+
         self.vocab_size = vocab_size
 
     def get_embedding_function(self) -> Callable[[str], np.ndarray]:
         def embedding_function(text: str) -> np.ndarray:
-            embedding = np.zeros(self.vocab_size)
-            
-            for char in text:
-                hash_val = hash(char) % self.vocab_size
-                embedding[hash_val] += 1
-            
-            if np.sum(embedding) > 0:
-                embedding = embedding / np.sum(embedding)
-            
+            # One C-level histogram over the UTF-8 bytes instead of a Python loop
+            # with a (per-process randomized) hash() per character. Byte-level
+            # hashing also makes the output reproducible across runs.
+            buf = np.frombuffer(text.encode("utf-8", "ignore"), dtype=np.uint8)
+            embedding = np.bincount(
+                buf.astype(np.int64) % self.vocab_size, minlength=self.vocab_size
+            ).astype(np.float64)
+
+            total = embedding.sum()
+            if total > 0:
+                embedding /= total
+
             return embedding
-        
-        return embedding_function
+
+        return self._maybe_cache(embedding_function)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import functools
-from collections import defaultdict
+import weakref
+from types import MethodType
 
 
 class HookManager:
@@ -9,17 +10,52 @@ class HookManager:
 
     Hooks are stored under an arbitrary `hook_key`. Callers register callbacks via `register()`
     and trigger them via `dispatch()`.
+
+    Bound methods are held via `weakref.WeakMethod` so a long-lived manager does not
+    keep short-lived listener objects (per-run observers, nodes) alive; dead entries
+    are pruned on dispatch. Plain functions and lambdas are stored strongly — a weak
+    reference to an inline lambda would die immediately.
     """
 
     def __init__(self):
-        self._hooks = defaultdict(list)
+        # Plain dict: a defaultdict would allocate (and keep) an empty list for
+        # every key ever dispatched, even with no listeners registered.
+        self._hooks: dict = {}
 
     def register(self, hook_key, func):
-        self._hooks[hook_key].append(func)
+        if isinstance(func, MethodType):
+            func = weakref.WeakMethod(func)
+        self._hooks.setdefault(hook_key, []).append(func)
+
+    @staticmethod
+    def _resolve(entry):
+        """Return the live callable for a registry entry, or None if it died."""
+        if type(entry) is weakref.WeakMethod:
+            return entry()
+        return entry
 
     def dispatch(self, hook_key, *args, **kwargs):
-        for func in self._hooks[hook_key]:
+        hooks = self._hooks.get(hook_key)
+        if not hooks:
+            return
+        dead = False
+        for entry in hooks:
+            if type(entry) is weakref.WeakMethod:
+                func = entry()
+                if func is None:
+                    dead = True
+                    continue
+            else:
+                func = entry
             func(*args, **kwargs)
+        if dead:
+            alive = [e for e in hooks if self._resolve(e) is not None]
+            if alive:
+                self._hooks[hook_key] = alive
+            else:
+                # Drop the key entirely so the masf_hook membership fast path
+                # skips dispatch again.
+                del self._hooks[hook_key]
 
     def has(self, hook_key, func=None) -> bool:
         """Check whether a hook key has any callbacks registered.
@@ -29,13 +65,13 @@ class HookManager:
             func: Optional specific callback to test membership.
 
         Returns:
-            True if there is at least one callback for `hook_key`, or if `func` is provided
-            and it is registered under `hook_key`.
+            True if there is at least one live callback for `hook_key`, or if `func` is
+            provided and it is registered under `hook_key`.
         """
         hooks = self._hooks.get(hook_key, [])
         if func is None:
-            return bool(hooks)
-        return func in hooks
+            return any(self._resolve(entry) is not None for entry in hooks)
+        return any(self._resolve(entry) == func for entry in hooks)
 
 
 class HookStage:
@@ -60,17 +96,27 @@ def masf_hook(stage_obj: HookStage):
     def decorator(func):
         @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
-            if not hasattr(self, "hooks") or not isinstance(self.hooks, HookManager):
+            # One getattr + duck typing instead of hasattr + isinstance on every
+            # call; anything exposing `_hooks`/`dispatch` quacks enough.
+            hooks = getattr(self, "hooks", None)
+            if hooks is None:
                 raise AttributeError(
                     f"{type(self).__name__} must have a 'hooks' attribute of type HookManager."
                 )
-            self.hooks.dispatch(stage_obj.BEFORE, self, *args, **kwargs)
+            # Bypass dispatch entirely for stages with no listeners — the common
+            # production case.
+            registry = hooks._hooks
+            dispatch = hooks.dispatch
+            if stage_obj.BEFORE in registry:
+                dispatch(stage_obj.BEFORE, self, *args, **kwargs)
             try:
                 result = func(self, *args, **kwargs)
             except Exception as err:
-                self.hooks.dispatch(stage_obj.ERROR, self, err, *args, **kwargs)
+                if stage_obj.ERROR in registry:
+                    dispatch(stage_obj.ERROR, self, err, *args, **kwargs)
                 raise
-            self.hooks.dispatch(stage_obj.AFTER, self, result, *args, **kwargs)
+            if stage_obj.AFTER in registry:
+                dispatch(stage_obj.AFTER, self, result, *args, **kwargs)
             return result
 
         return wrapper
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 
 from masfactory.utils.naming import validate_name
@@ -26,6 +27,11 @@ class PathFilter:
 
     tokens: tuple[str, ...]
     raw: str
+    # Pattern augmented with the implicit leading/trailing "**", precomputed at
+    # parse time so matching never rebuilds it.
+    pattern: tuple[str, ...] = ()
+    # Cached at parse time; wildcard-free patterns take the slice-search fast path.
+    has_wildcard: bool = True
 
 
 def parse_path_filter(path_filter: str) -> PathFilter:
@@ -43,9 +49,17 @@ def parse_path_filter(path_filter: str) -> PathFilter:
             tokens.append(part)
             continue
         validate_name(part, kind="path segment")
-        tokens.append(part)
+        # Interned literals make the DP's segment comparisons pointer checks
+        # when the path segments are interned too (identifiers usually are).
+        tokens.append(sys.intern(part))
 
-    return PathFilter(tokens=tuple(tokens), raw=raw)
+    token_tuple = tuple(tokens)
+    return PathFilter(
+        tokens=token_tuple,
+        raw=raw,
+        pattern=("**",) + token_tuple + ("**",),
+        has_wildcard="*" in token_tuple or "**" in token_tuple,
+    )
 
 
 def match_path_filter(path_filter: PathFilter, path: tuple[str, ...]) -> bool:
@@ -55,33 +69,40 @@ def match_path_filter(path_filter: PathFilter, path: tuple[str, ...]) -> bool:
     This is implemented by anchoring the pattern to the full path while prefixing/suffixing it with
     an implicit "**" so the match can start/end at arbitrary positions.
     """
-    pattern = ("**",) + path_filter.tokens + ("**",)
-
-    # Standard glob-style DP matching for tokens over path segments.
-    memo: dict[tuple[int, int], bool] = {}
-
-    def dp(i: int, j: int) -> bool:
-        key = (i, j)
-        if key in memo:
-            return memo[key]
-
-        if i == len(pattern):
-            return j == len(path)
-
+    tokens = path_filter.tokens
+
+    # Wildcard-free patterns — the common case — reduce to a contiguous slice
+    # search; a single literal token is one containment check.
+    if not path_filter.has_wildcard:
+        if len(tokens) == 1:
+            return tokens[0] in path
+        window = len(tokens)
+        return any(
+            path[i:i + window] == tokens for i in range(len(path) - window + 1)
+        )
+
+    pattern = path_filter.pattern or ("**",) + tokens + ("**",)
+
+    # Iterative glob-style DP over (pattern position, path position), filled
+    # bottom-up one pattern row at a time; no recursion and no per-call memo dict.
+    n = len(path)
+    prev = [False] * (n + 1)
+    prev[n] = True
+    for i in range(len(pattern) - 1, -1, -1):
         token = pattern[i]
-
+        cur = [False] * (n + 1)
         if token == "**":
             # Match zero segments, or consume one segment and stay on "**".
-            ans = dp(i + 1, j) or (j < len(path) and dp(i, j + 1))
+            for j in range(n, -1, -1):
+                cur[j] = prev[j] or (j < n and cur[j + 1])
         elif token == "*":
-            ans = j < len(path) and dp(i + 1, j + 1)
+            for j in range(n):
+                cur[j] = prev[j + 1]
         else:
-            ans = j < len(path) and path[j] == token and dp(i + 1, j + 1)
-
-        memo[key] = ans
-        return ans
-
-    return dp(0, 0)
+            for j in range(n):
+                cur[j] = path[j] == token and prev[j + 1]
+        prev = cur
+    return prev[0]
 
 
 __all__ = ["PathFilter", "parse_path_filter", "match_path_filter"]
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Callable
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SelectionTarget:
     """
     A small, uniform view of "something selectable".
@@ -38,8 +38,14 @@ class Selector:
     Two explicit entry points exist to keep APIs clear:
     - match(obj): runtime instance matching (hooks)
     - match_declaration(name, cls): declaration matching (NodeTemplate)
+
+    Callers testing many selectors against the same object should build the
+    `SelectionTarget` once and use `match_target(target)` directly.
     """
 
+    # Slots keep the hot match path on C-level attribute loads.
+    __slots__ = ("_type_filter", "_name_filter", "_name_match", "_predicate", "_compiled")
+
     def __init__(
         self,
         *,
@@ -57,11 +63,13 @@ class Selector:
         """
         self._type_filter = self._normalize_type_filter(type_filter)
         self._name_filter = name_filter
+        self._name_match = self._compile_name_filter(name_filter)
         self._predicate = predicate
+        self._compiled = None
 
     def match(self, obj: object) -> bool:
         """Match a runtime instance against this selector."""
-        return self._match_target(SelectionTarget.from_obj(obj))
+        return self.match_target(SelectionTarget.from_obj(obj))
 
     def match_declaration(self, *, name: str | None, cls: type | None) -> bool:
         """Match a (name, type) declaration against this selector.
@@ -69,40 +77,91 @@ class Selector:
         This is used by NodeTemplate materialization where only a declared name/type is
         available (no live instance).
         """
-        return self._match_target(SelectionTarget(name=name, cls=cls, obj=None))
-
-    def _match_target(self, target: SelectionTarget) -> bool:
-        if self._type_filter:
-            if target.cls is None:
-                return False
-            if not issubclass(target.cls, self._type_filter):
-                return False
-
-        if self._name_filter is not None:
-            if target.name is None:
-                return False
-            name = target.name
-
-            if isinstance(self._name_filter, str):
-                if name != self._name_filter:
-                    return False
-            elif isinstance(self._name_filter, (list, set, tuple)):
-                if name not in self._name_filter:
-                    return False
-            elif hasattr(self._name_filter, "match") and callable(getattr(self._name_filter, "match")):
-                if not self._name_filter.match(name):
-                    return False
-            elif callable(self._name_filter):
-                if not self._name_filter(name):
+        return self.match_target(SelectionTarget(name=name, cls=cls, obj=None))
+
+    def match_target(self, target: SelectionTarget) -> bool:
+        """Match an already-built `SelectionTarget`.
+
+        Public so fan-out callers can normalize an object once and test it
+        against many selectors without re-deriving the target per selector.
+        """
+        compiled = self._compiled
+        if compiled is None:
+            compiled = self.compile()
+        return compiled(target)
+
+    def compile(self) -> Callable[[SelectionTarget], bool]:
+        """Return (and cache) a predicate with the configured filters inlined.
+
+        Specializing on which filters are actually set removes the per-match
+        branch ladder and attribute loads; callers doing O(targets × selectors)
+        matching can store the result and call it directly.
+        """
+        compiled = self._compiled
+        if compiled is not None:
+            return compiled
+
+        type_f = self._type_filter
+        name_match = self._name_match
+        pred = self._predicate
+
+        if type_f and name_match:
+            def compiled(target: SelectionTarget) -> bool:
+                cls = target.cls
+                name = target.name
+                if cls is None or not issubclass(cls, type_f):
                     return False
-            else:
-                if name != self._name_filter:
+                if name is None or not name_match(name):
                     return False
+                return pred is None or bool(pred(target))
+        elif type_f and pred:
+            def compiled(target: SelectionTarget) -> bool:
+                cls = target.cls
+                return cls is not None and issubclass(cls, type_f) and bool(pred(target))
+        elif type_f:
+            def compiled(target: SelectionTarget) -> bool:
+                cls = target.cls
+                return cls is not None and issubclass(cls, type_f)
+        elif name_match and pred:
+            def compiled(target: SelectionTarget) -> bool:
+                name = target.name
+                return name is not None and name_match(name) and bool(pred(target))
+        elif name_match:
+            def compiled(target: SelectionTarget) -> bool:
+                name = target.name
+                return name is not None and name_match(name)
+        elif pred:
+            def compiled(target: SelectionTarget) -> bool:
+                return bool(pred(target))
+        else:
+            def compiled(target: SelectionTarget) -> bool:
+                return True
+
+        self._compiled = compiled
+        return compiled
 
-        if self._predicate and not self._predicate(target):
-            return False
+    @staticmethod
+    def _compile_name_filter(name_filter):
+        """Compile the polymorphic name filter into one `str -> bool` callable.
 
-        return True
+        This moves the isinstance/hasattr dispatch ladder from every match call
+        to construction time; list/tuple filters additionally become frozensets
+        so membership is O(1).
+        """
+        if name_filter is None:
+            return None
+        if isinstance(name_filter, str):
+            return name_filter.__eq__
+        if isinstance(name_filter, (set, frozenset)):
+            return name_filter.__contains__
+        if isinstance(name_filter, (list, tuple)):
+            return frozenset(name_filter).__contains__
+        matcher = getattr(name_filter, "match", None)
+        if callable(matcher):
+            return lambda name, _match=matcher: bool(_match(name))
+        if callable(name_filter):
+            return name_filter
+        return name_filter.__eq__
 
     @staticmethod
     def _normalize_type_filter(type_filter):
@@ -24,15 +24,35 @@ if "__path__" not in globals():  # pragma: no cover
 
     __path__ = [str(Path(__file__).resolve().parent)]
 
-from .client import (  # noqa: F401
-    VISUALIZER_PROTOCOL_VERSION,
-    VisualizerBridge,
-    VisualizerClient,
-    VisualizerOpenFileOptions,
-    connect,
-    connect_bridge,
-    get_bridge,
-    get_client,
-    is_available,
-)
-from .runtime import VisualizerRuntime, get_visualizer_runtime  # noqa: F401
+# PEP 562 lazy exports: the bridge stack (websocket client, runtime, serializers)
+# is only imported on first attribute access, so `import masfactory.visualizer`
+# stays cheap when the extension is not attached — the production default.
+_LAZY = {
+    "VISUALIZER_PROTOCOL_VERSION": ("masfactory.visualizer.client", "VISUALIZER_PROTOCOL_VERSION"),
+    "VisualizerBridge": ("masfactory.visualizer.client", "VisualizerBridge"),
+    "VisualizerClient": ("masfactory.visualizer.client", "VisualizerClient"),
+    "VisualizerOpenFileOptions": ("masfactory.visualizer.client", "VisualizerOpenFileOptions"),
+    "connect": ("masfactory.visualizer.client", "connect"),
+    "connect_bridge": ("masfactory.visualizer.client", "connect_bridge"),
+    "get_bridge": ("masfactory.visualizer.client", "get_bridge"),
+    "get_client": ("masfactory.visualizer.client", "get_client"),
+    "is_available": ("masfactory.visualizer.client", "is_available"),
+    "VisualizerRuntime": ("masfactory.visualizer.runtime", "VisualizerRuntime"),
+    "get_visualizer_runtime": ("masfactory.visualizer.runtime", "get_visualizer_runtime"),
+}
+
+
+def __getattr__(name):
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(target[0]), target[1])
+    # Cache on the module so subsequent accesses skip __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import functools
 import os
+import queue
+import threading
+import weakref
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from typing import Literal
 
 from .runtime import VISUALIZER_ENABLED, VisualizerRuntime, get_visualizer_runtime
@@ -10,7 +15,62 @@ VISUALIZER_PROTOCOL_VERSION = 1
 
 VisualizerView = Literal["auto", "preview", "vibe"]
 
-@dataclass(frozen=True)
+# O(1) membership for open_file's view validation.
+_VIEWS: frozenset[str] = frozenset({"auto", "preview", "vibe"})
+
+# Per-view preserve-focus defaults: Vibe editing happens inside the Visualizer,
+# so keep focus there; other views hand focus to the editor.
+_PRESERVE_FOCUS_DEFAULT: dict[str, bool] = {"auto": False, "preview": False, "vibe": True}
+
+
+def _safe(default=None):
+    """Best-effort guard: swallow any exception and return `default`.
+
+    One decorator instead of a try/except block in every method keeps the
+    method bodies to plain calls (shorter bytecode, CPython inline caches
+    stay effective) while preserving the never-break contract.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                return default
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=512)
+def _abs(path: str) -> str:
+    """Cached `os.path.abspath`; repeated opens of the same file skip the
+    getcwd syscall and normpath string work."""
+    return os.path.abspath(path)
+
+
+# Constant part of the UI_OPEN_FILE payload, spread into each request.
+_OPEN_FILE_BASE: dict[str, object] = {
+    "type": "UI_OPEN_FILE",
+    "visualizerProtocolVersion": VISUALIZER_PROTOCOL_VERSION,
+}
+
+# Delta-encoding bounds for attr pull/push payloads: cap how many node
+# baselines are retained, and resync with a full snapshot every N deltas so a
+# late-attaching UI can reconstruct state.
+_ATTR_BASELINE_MAX_NODES = 1024
+_ATTR_FULL_SNAPSHOT_EVERY = 50
+_MISSING = object()
+
+
+def _format_run_log(stage: str, graph_name: object, counter_label: str, count: int | None) -> str:
+    if count is None:
+        return f"[run] {stage} graph={graph_name}"
+    return f"[run] {stage} graph={graph_name} {counter_label}={count}"
+
+@dataclass(frozen=True, slots=True)
 class VisualizerOpenFileOptions:
     """Options for opening a file in the Visualizer UI."""
 
@@ -38,8 +98,118 @@ class VisualizerClient:
             runtime: Connected VisualizerRuntime instance used for transport.
         """
         self._runtime = runtime
+        # One cached boolean makes every notify method a branch-and-return when
+        # the visualizer is off — the dominant production deployment.
+        self._enabled = bool(VISUALIZER_ENABLED) and runtime is not None
+        # Fire-and-forget notifications are handed to a single daemon drainer
+        # so callers never pay payload shaping / transport costs inline.
+        # node_start/node_end/node_error stay synchronous: they snapshot
+        # wall-clock and token-tracker state at call time and return a context.
+        self._q: "queue.Queue[tuple[str, tuple, dict] | tuple[str, threading.Event]]" = queue.Queue(
+            maxsize=10000
+        )
+        # Bound once: the producer hot path is then one local call instead of
+        # two attribute chains per event.
+        self._put_nowait = self._q.put_nowait
+        # Per-node last-sent snapshots for attr pull/push delta encoding.
+        self._last_pull: dict[int, list] = {}
+        self._last_push: dict[int, list] = {}
+        # Events dropped on queue overflow; reported as one DROP_STATS frame
+        # from the drainer instead of ever blocking the caller.
+        self._dropped = 0
+        # Primed by set_active_graph; saves a getattr per run start/done log.
+        self._active_graph_name = "unknown"
+        self._drainer: threading.Thread | None = None
+        if self._enabled:
+            self._drainer = threading.Thread(
+                target=self._drain_loop, name="masfactory-visualizer-client", daemon=True
+            )
+            self._drainer.start()
+
+    @staticmethod
+    def _delta_values(
+        baselines: dict[int, list], node: object, values: dict
+    ) -> tuple[dict, int, bool]:
+        """Compute the wire payload for an attr snapshot against its baseline.
+
+        Returns `(payload, base_version, full)`: the changed keys only (or the
+        full snapshot on first sight, on periodic resync, or when comparison
+        fails), a monotonically increasing per-node version, and whether the
+        payload is a full snapshot. Baselines are evicted oldest-first once
+        `_ATTR_BASELINE_MAX_NODES` nodes are tracked.
+        """
+        key = id(node)
+        entry = baselines.get(key)
+        if entry is None:
+            if len(baselines) >= _ATTR_BASELINE_MAX_NODES:
+                baselines.pop(next(iter(baselines)))
+            baselines[key] = [dict(values), 1, 0]
+            return dict(values), 1, True
+
+        baseline, version, since_full = entry
+        version += 1
+        full = since_full + 1 >= _ATTR_FULL_SNAPSHOT_EVERY
+        if not full:
+            try:
+                payload = {k: v for k, v in values.items() if baseline.get(k, _MISSING) != v}
+            except Exception:
+                # Values with broken/expensive __eq__: fall back to a full send.
+                full = True
+        if full:
+            payload = dict(values)
+        entry[0] = dict(values)
+        entry[1] = version
+        entry[2] = 0 if full else since_full + 1
+        return payload, version, full
+
+    def _enqueue(self, op: str, args: tuple = (), kwargs: dict | None = None) -> None:
+        """Queue a runtime call for the drainer; drops on overflow (best-effort)."""
+        try:
+            self._put_nowait((op, args, kwargs or {}))
+        except queue.Full:
+            # Plain int increment is GIL-atomic enough for a telemetry counter.
+            self._dropped += 1
+
+    def _drain_loop(self) -> None:
+        runtime = self._runtime
+        q = self._q
+        while True:
+            item = q.get()
+            op = item[0]
+            if op != "__flush__":
+                try:
+                    getattr(runtime, op)(*item[1], **item[2])
+                except Exception:
+                    pass
+            if self._dropped and q.empty():
+                dropped, self._dropped = self._dropped, 0
+                try:
+                    runtime.send_message(
+                        {"type": "DROP_STATS", "dropped": dropped},
+                        require_connection=False,
+                    )
+                except Exception:
+                    pass
+            if op == "__flush__":
+                item[1].set()
+
+    def flush(self, timeout_s: float = 1.0) -> bool:
+        """Wait until everything queued before this call has been dispatched.
+
+        Returns True if the queue drained within the timeout.
+        """
+        if not self._enabled:
+            return True
+        done = threading.Event()
+        try:
+            self._q.put_nowait(("__flush__", done))
+        except queue.Full:
+            return False
+        return done.wait(timeout=max(0.0, float(timeout_s)))
 
-    @property
+    # Cached: the runtime's pid/mode are write-once after start, and these may
+    # be read per event by log formatters / telemetry tags.
+    @cached_property
     def pid(self) -> int | None:
         try:
             v = getattr(self._runtime, "_pid", None)
@@ -47,27 +217,31 @@ class VisualizerClient:
         except Exception:
             return None
 
-    @property
+    @cached_property
     def mode(self) -> str:
         try:
             return str(getattr(self._runtime, "mode", "unknown") or "unknown")
         except Exception:
             return "unknown"
 
+    @_safe(default=False)
     def connect(self, *, timeout_s: float = 2.0) -> bool:
-        try:
-            self._runtime.start()
-            return self._runtime.wait_connected(timeout_s=max(0.0, float(timeout_s)))
-        except Exception:
+        if not self._enabled:
             return False
+        # Reconnects may change runtime identity details; recompute on next read.
+        self.__dict__.pop("pid", None)
+        self.__dict__.pop("mode", None)
+        self._runtime.start()
+        return self._runtime.wait_connected(timeout_s=max(0.0, float(timeout_s)))
 
+    @_safe(default=False)
     def is_connected(self) -> bool:
-        try:
-            return self._runtime.is_connected()
-        except Exception:
+        if not self._enabled:
             return False
+        return self._runtime.is_connected()
 
     # Graph lifecycle APIs for framework internals.
+    @_safe()
     def attach_graph(self, root_graph: object) -> None:
         """
         Attach Visualizer runtime hooks to a built RootGraph.
@@ -75,29 +249,30 @@ class VisualizerClient:
         This should be called once after the graph is fully built (nodes/edges exist),
         so we don't need to re-register hooks per-invocation.
         """
-        try:
-            from .runtime_hooks import install_root_graph_runtime_hooks
-
-            self.set_active_graph(root_graph)
-            install_root_graph_runtime_hooks(root_graph, self)
-        except Exception:
+        if not self._enabled:
             return
+        from .runtime_hooks import install_root_graph_runtime_hooks
+
+        self.set_active_graph(root_graph)
+        install_root_graph_runtime_hooks(root_graph, self)
 
+    @_safe()
     def begin_run(self, root_graph: object, *, input: dict[str, object] | None = None) -> None:
         """
         Prepare Visualizer runtime state for a new run without re-installing hooks.
         """
-        try:
-            from .runtime_hooks import reset_root_graph_runtime_hooks
-
-            reset_root_graph_runtime_hooks(root_graph, self)
-            if isinstance(input, dict):
-                self.log("info", f"[run] start graph={getattr(root_graph, 'name', 'unknown')} inputKeys={list(input.keys())}")
-            else:
-                self.log("info", f"[run] start graph={getattr(root_graph, 'name', 'unknown')}")
-        except Exception:
+        if not self._enabled:
             return
+        from .runtime_hooks import reset_root_graph_runtime_hooks
+
+        reset_root_graph_runtime_hooks(root_graph, self)
+        # Capture O(1) facts here; the drainer formats the line only if the
+        # event is actually recorded.
+        graph_name = self._active_graph_name
+        input_keys = len(input) if isinstance(input, dict) else None
+        self.log("info", lambda: _format_run_log("start", graph_name, "inputKeys", input_keys))
 
+    @_safe()
     def end_run(self, root_graph: object, *, output: dict[str, object] | None = None) -> None:
         """Report the end of a run to the Visualizer (best-effort).
 
@@ -105,27 +280,29 @@ class VisualizerClient:
             root_graph: RootGraph instance that just completed.
             output: Optional exit payload to summarize in logs.
         """
-        try:
-            if isinstance(output, dict):
-                self.log("info", f"[run] done graph={getattr(root_graph, 'name', 'unknown')} outputKeys={list(output.keys())}")
-            else:
-                self.log("info", f"[run] done graph={getattr(root_graph, 'name', 'unknown')}")
-        except Exception:
+        if not self._enabled:
             return
+        graph_name = self._active_graph_name
+        output_keys = len(output) if isinstance(output, dict) else None
+        self.log("info", lambda: _format_run_log("done", graph_name, "outputKeys", output_keys))
+        self.flush(timeout_s=1.0)
 
     # Runtime/telemetry APIs for framework internals.
+    @_safe()
     def set_active_graph(self, root_graph: object) -> None:
-        try:
-            self._runtime.set_active_graph(root_graph)
-        except Exception:
+        if not self._enabled:
             return
+        self._active_graph_name = str(getattr(root_graph, "name", "unknown") or "unknown")
+        self._runtime.set_active_graph(root_graph)
 
-    def log(self, level: str, message: str) -> None:
-        try:
-            self._runtime.log(level, message)
-        except Exception:
+    def log(self, level: str, message) -> None:
+        """Forward a log line; `message` may be a zero-arg callable that the
+        runtime invokes lazily when the event is recorded."""
+        if not self._enabled:
             return
+        self._enqueue("log", (level, message))
 
+    @_safe()
     def node_start(self, node: object, inputs: dict[str, object]) -> object | None:
         """Notify the Visualizer that a node is about to execute.
 
@@ -137,11 +314,11 @@ class VisualizerClient:
             An opaque context object produced by the runtime, or None on failure. The returned
             context can be passed back into `node_end()` / `node_error()`.
         """
-        try:
-            return self._runtime.node_start(node, inputs)
-        except Exception:
+        if not self._enabled:
             return None
+        return self._runtime.node_start(node, inputs)
 
+    @_safe()
     def node_end(self, ctx: object | None, outputs: dict[str, object], node: object | None = None) -> None:
         """Notify the Visualizer that a node finished successfully.
 
@@ -150,11 +327,11 @@ class VisualizerClient:
             outputs: Node output payload.
             node: Optional node object when context is unavailable.
         """
-        try:
-            self._runtime.node_end(ctx, outputs, node=node)
-        except Exception:
+        if not self._enabled:
             return
+        self._runtime.node_end(ctx, outputs, node=node)
 
+    @_safe()
     def node_error(self, ctx: object | None, err: BaseException) -> None:
         """Notify the Visualizer that a node execution failed.
 
@@ -162,10 +339,9 @@ class VisualizerClient:
             ctx: Context returned by `node_start()` (may be None).
             err: Exception raised by node execution.
         """
-        try:
-            self._runtime.node_error(ctx, err)
-        except Exception:
+        if not self._enabled:
             return
+        self._runtime.node_error(ctx, err)
 
     def flow_edge_send(
         self,
@@ -183,10 +359,13 @@ class VisualizerClient:
             edge_keys: Optional edge key mapping for the send.
             message: Optional message payload being sent.
         """
-        try:
-            self._runtime.flow_edge_send(sender, receiver, edge_keys=edge_keys, message=message)
-        except Exception:
+        if not self._enabled:
             return
+        self._enqueue(
+            "flow_edge_send",
+            (sender, receiver),
+            {"edge_keys": edge_keys, "message": message},
+        )
 
     def flow_attr_pull(
         self,
@@ -208,17 +387,29 @@ class VisualizerClient:
             total_keys: Total number of keys pulled before truncation (if known).
             truncated: Whether the keys/values were truncated to limit payload size.
         """
-        try:
-            self._runtime.flow_attr_pull(
-                node,
-                scope=scope,
-                keys=keys,
-                values=values,
-                total_keys=total_keys,
-                truncated=truncated,
-            )
-        except Exception:
+        if not self._enabled:
             return
+        if values is not None and not isinstance(values, dict):
+            # Lazy mapping from the hooks: fetch values only now that the
+            # event is known to be emitted.
+            values = dict(values) or None
+        base_version = None
+        full = None
+        if isinstance(values, dict) and values:
+            values, base_version, full = self._delta_values(self._last_pull, node, values)
+        self._enqueue(
+            "flow_attr_pull",
+            (node,),
+            {
+                "scope": scope,
+                "keys": keys,
+                "values": values,
+                "total_keys": total_keys,
+                "truncated": truncated,
+                "base_version": base_version,
+                "full": full,
+            },
+        )
 
     def flow_attr_push(
         self,
@@ -238,17 +429,26 @@ class VisualizerClient:
             total_keys: Total number of changed keys before truncation (if known).
             truncated: Whether the changes payload was truncated to limit size.
         """
-        try:
-            self._runtime.flow_attr_push(
-                node,
-                scope=scope,
-                changes=changes,
-                total_keys=total_keys,
-                truncated=truncated,
-            )
-        except Exception:
+        if not self._enabled:
             return
-
+        base_version = None
+        full = None
+        if isinstance(changes, dict) and changes:
+            changes, base_version, full = self._delta_values(self._last_push, node, changes)
+        self._enqueue(
+            "flow_attr_push",
+            (node,),
+            {
+                "scope": scope,
+                "changes": changes,
+                "total_keys": total_keys,
+                "truncated": truncated,
+                "base_version": base_version,
+                "full": full,
+            },
+        )
+
+    @_safe()
     def request_user_input(
         self,
         *,
@@ -272,17 +472,16 @@ class VisualizerClient:
         Returns:
             User response string, or None if Visualizer is unavailable or the request times out.
         """
-        try:
-            resp = self._runtime.request_interaction(
-                node=node,
-                prompt=prompt,
-                field=field,
-                description=description,
-                timeout_s=timeout_s,
-                meta=meta,
-            )
-        except Exception:
+        if not self._enabled:
             return None
+        resp = self._runtime.request_interaction(
+            node=node,
+            prompt=prompt,
+            field=field,
+            description=description,
+            timeout_s=timeout_s,
+            meta=meta,
+        )
         if resp is None:
             return None
         return resp if isinstance(resp, str) else str(resp)
@@ -296,22 +495,22 @@ class VisualizerClient:
         Returns:
             True if the request was sent, otherwise False.
         """
+        if not self._enabled:
+            return False
         file_path = options.file_path if isinstance(options.file_path, str) else ""
         file_path = file_path.strip()
         if not file_path:
             return False
 
-        view: VisualizerView = options.view if options.view in ("auto", "preview", "vibe") else "auto"
+        view: VisualizerView = options.view if options.view in _VIEWS else "auto"
 
         preserve_focus = options.preserve_focus
         if preserve_focus is None:
-            # Default UX: Vibe editing happens inside Visualizer, so keep focus there.
-            preserve_focus = view == "vibe"
+            preserve_focus = _PRESERVE_FOCUS_DEFAULT[view]
 
         payload: dict[str, object] = {
-            "type": "UI_OPEN_FILE",
-            "visualizerProtocolVersion": VISUALIZER_PROTOCOL_VERSION,
-            "filePath": os.path.abspath(file_path),
+            **_OPEN_FILE_BASE,
+            "filePath": _abs(file_path),
             "view": view,
             "reveal": bool(options.reveal),
             "preserveFocus": bool(preserve_focus),
@@ -319,6 +518,11 @@ class VisualizerClient:
         return self._runtime.send_message(payload, require_connection=True)
 
 _CLIENT_SINGLETON: VisualizerClient | None = None
+_SINGLETON_LOCK = threading.Lock()
+
+# One client per runtime so every subsystem shares the same event queue and
+# delta baselines (weak values: entries vanish with their last strong ref).
+_CLIENTS: "weakref.WeakValueDictionary[int, VisualizerClient]" = weakref.WeakValueDictionary()
 
 VisualizerBridge = VisualizerClient
 
@@ -327,12 +531,20 @@ def is_available() -> bool:
 
 def get_client() -> VisualizerClient | None:
     """
-    Return a client wrapper if Visualizer env vars are present; does not attempt to connect.
+    Return the shared client for the runtime if Visualizer env vars are present;
+    does not attempt to connect.
     """
     runtime = get_visualizer_runtime()
     if runtime is None:
         return None
-    return VisualizerClient(runtime)
+    client = _CLIENTS.get(id(runtime))
+    if client is None:
+        with _SINGLETON_LOCK:
+            client = _CLIENTS.get(id(runtime))
+            if client is None:
+                client = VisualizerClient(runtime)
+                _CLIENTS[id(runtime)] = client
+    return client
 
 def connect(*, timeout_s: float = 2.0) -> VisualizerClient | None:
     """
@@ -342,11 +554,10 @@ def connect(*, timeout_s: float = 2.0) -> VisualizerClient | None:
     """
     global _CLIENT_SINGLETON
 
-    runtime = get_visualizer_runtime()
-    if runtime is None:
+    client = get_client()
+    if client is None:
         return None
-
-    client = _CLIENT_SINGLETON or VisualizerClient(runtime)
+    # Keep one strong reference so the shared client outlives its callers.
     _CLIENT_SINGLETON = client
 
     if not client.connect(timeout_s=timeout_s):
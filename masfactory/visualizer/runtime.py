@@ -1,27 +1,123 @@
 from __future__ import annotations
 
+import collections
+import contextlib
+import itertools
 import json
 import os
-import queue
+import selectors
 import socket
 import threading
 import time
-import uuid
 from dataclasses import dataclass
 from typing import Any
 
 from .ws import (
     WebSocketError,
+    WsReader,
+    ws_encode_frame,
+    ws_encode_text_frame,
     ws_handshake,
+    ws_peer_is_loopback,
     ws_send_close,
-    ws_send_pong,
-    ws_send_text,
-    ws_try_decode_frame,
+    ws_set_trusted_peer,
 )
 
 # Public flag for cheap fast-path checks in hot code paths.
 VISUALIZER_ENABLED: bool = bool(os.environ.get("MASFACTORY_VISUALIZER_PORT"))
 
+# Cap on the serialized size of one coalesced BATCH frame; bursts larger than
+# this are split across frames instead of producing one unbounded write.
+_BATCH_MAX_BYTES = 256 * 1024
+
+# Unflushed outbound bytes beyond this mean the peer has stopped reading;
+# treat the connection as dead rather than buffering without bound.
+_SEND_PENDING_MAX = 4 * 1024 * 1024
+
+# Merge runs of identical-edge EDGE_SEND events into one counted frame.
+# Settable to "0" to send every event expanded (correctness testing).
+_COALESCE_EDGE_SENDS = os.environ.get("MASFACTORY_VISUALIZER_COALESCE", "1") != "0"
+
+
+def _coalesce_edge_sends(msgs: list) -> list:
+    """Collapse consecutive EDGE_SEND events on the same edge.
+
+    Fan-out graphs fire the same sender->receiver edge many times per burst;
+    adjacent events with identical from/to/keys become one frame carrying a
+    `count` and the last message. Only last-element collapse — events on
+    different edges are never reordered. Pre-encoded (bytes) entries pass
+    through untouched; only EDGE_SEND events are queued as dicts.
+    """
+    if len(msgs) < 2:
+        return msgs
+    out: list = []
+    for msg in msgs:
+        if out and isinstance(msg, dict) and msg.get("kind") == "EDGE_SEND":
+            prev = out[-1]
+            if (
+                isinstance(prev, dict)
+                and prev.get("kind") == "EDGE_SEND"
+                and prev.get("from") == msg.get("from")
+                and prev.get("to") == msg.get("to")
+                and prev.get("keys") == msg.get("keys")
+            ):
+                prev["count"] = prev.get("count", 1) + 1
+                prev["ts"] = msg.get("ts", prev.get("ts"))
+                if "message" in msg:
+                    prev["lastMessage"] = msg["message"]
+                    prev.pop("message", None)
+                if "keysDetails" in msg:
+                    prev["keysDetails"] = msg["keysDetails"]
+                continue
+        out.append(msg)
+    return out
+
+# Serializer for outbound frames: orjson when available (C-accelerated, emits
+# bytes the WS layer can send as-is), stdlib json otherwise. Both apply the
+# same default=str fallback the event payloads rely on. The stdlib path uses
+# one prebuilt encoder so per-call kwargs parsing in json.dumps is skipped.
+try:
+    import orjson
+
+    def _dumps(obj: object) -> bytes:
+        return orjson.dumps(obj, default=str)
+
+except ImportError:
+    _STDLIB_ENCODE = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+    def _dumps(obj: object) -> bytes:
+        return _STDLIB_ENCODE(obj).encode("utf-8")
+
+
+# Linux-only; absent elsewhere (macOS has TCP_NOPUSH but does not flush
+# reliably on clear, so we only cork where semantics are well-defined).
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+
+
+@contextlib.contextmanager
+def _cork(sock: socket.socket):
+    """Hold small writes in the kernel until the block exits.
+
+    Frames written inside the block (heartbeat, event batch, graph) leave as
+    full segments instead of one tinygram each; a no-op where TCP_CORK is
+    unavailable or the socket refuses it.
+    """
+    if _TCP_CORK is None:
+        yield
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 1)
+    except OSError:
+        yield
+        return
+    try:
+        yield
+    finally:
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 0)
+        except OSError:
+            pass
+
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
@@ -44,25 +140,153 @@ def _as_str(value: object) -> str | None:
     return None
 
 
-@dataclass
+# ---------------------------------------------------------------------------
+# History sanitization: type-dispatched handlers. `type(value)` keyed lookup
+# replaces the isinstance ladder the recursive walk paid per element; exact
+# common types hit the table, subclasses fall through to `_hist_fallback`
+# which re-checks with isinstance once.
+
+
+def _hist_truncate(rt: "VisualizerRuntime", s: str) -> str:
+    if len(s) <= rt._history_max_str:
+        return s
+    rt._history_truncated_fields += 1
+    return s[: rt._history_max_str] + "…(truncated)"
+
+
+def _hist_scalar(rt: "VisualizerRuntime", value: object, depth: int, budget: list[int]) -> object:
+    return value
+
+
+def _hist_str(rt: "VisualizerRuntime", value: str, depth: int, budget: list[int]) -> str:
+    out = _hist_truncate(rt, value)
+    budget[0] -= len(out)
+    return out
+
+
+def _hist_dict(rt: "VisualizerRuntime", value: dict, depth: int, budget: list[int]) -> object:
+    if depth <= 0:
+        return _hist_str(rt, str(value), depth, budget)
+    dispatch = _HIST_DISPATCH
+    out: dict[str, object] = {}
+    i = 0
+    for k, v in value.items():
+        if i >= 50 or budget[0] <= 0:
+            rt._history_truncated_fields += 1
+            out["__masfactory_visualizer_truncated__"] = True
+            out["__masfactory_visualizer_items__"] = i
+            break
+        fn = dispatch.get(type(v), _hist_fallback)
+        out[str(k)] = fn(rt, v, depth - 1, budget)
+        i += 1
+    return out
+
+
+def _hist_seq(rt: "VisualizerRuntime", value, depth: int, budget: list[int]) -> object:
+    if depth <= 0:
+        return _hist_str(rt, str(value), depth, budget)
+    dispatch = _HIST_DISPATCH
+    out_list: list[object] = []
+    for i, v in enumerate(value):
+        if i >= 50 or budget[0] <= 0:
+            rt._history_truncated_fields += 1
+            out_list.append("…(truncated)")
+            break
+        fn = dispatch.get(type(v), _hist_fallback)
+        out_list.append(fn(rt, v, depth - 1, budget))
+    return out_list
+
+
+def _hist_fallback(rt: "VisualizerRuntime", value: object, depth: int, budget: list[int]) -> object:
+    if value is None or isinstance(value, (int, float)):
+        # bool is an int subclass; both pass through untouched.
+        return value
+    if isinstance(value, str):
+        return _hist_str(rt, value, depth, budget)
+    if isinstance(value, dict):
+        return _hist_dict(rt, value, depth, budget)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return _hist_seq(rt, value, depth, budget)
+    return _hist_str(rt, str(value), depth, budget)
+
+
+_HIST_DISPATCH = {
+    type(None): _hist_scalar,
+    bool: _hist_scalar,
+    int: _hist_scalar,
+    float: _hist_scalar,
+    str: _hist_str,
+    dict: _hist_dict,
+    list: _hist_seq,
+    tuple: _hist_seq,
+    set: _hist_seq,
+}
+
+
+# Upper bound on recycled _NodeRunContext instances kept between executions.
+_CTX_POOL_MAX = 256
+
+
+@dataclass(slots=True)
 class _NodeRunContext:
-    """Execution context captured at node start and used to compute end metrics."""
+    """Execution context captured at node start and used to compute end metrics.
+
+    Instances are recycled through the runtime's context pool; `released`
+    guards against returning the same context twice when both the error and
+    end paths fire for one execution.
+    """
 
     node_name: str
     run_id: str
     started_ms: int
     token_before_in: int | None = None
     token_before_out: int | None = None
+    tracker: object | None = None
+    released: bool = False
 
-
-@dataclass
+    def reset(
+        self,
+        node_name: str,
+        run_id: str,
+        started_ms: int,
+        token_before_in: int | None,
+        token_before_out: int | None,
+        tracker: object | None,
+    ) -> "_NodeRunContext":
+        self.node_name = node_name
+        self.run_id = run_id
+        self.started_ms = started_ms
+        self.token_before_in = token_before_in
+        self.token_before_out = token_before_out
+        self.tracker = tracker
+        self.released = False
+        return self
+
+
+@dataclass(slots=True)
 class _PendingInteraction:
-    """Pending human interaction request tracked until a response arrives."""
+    """Pending human interaction request tracked until a response arrives.
+
+    Recycled through the runtime's interaction pool. `event` is allocated
+    lazily — only when the requester actually has to block; a response that
+    arrives before the wait (common on localhost) never creates one.
+    `response_ready` is the flag of record, set under the runtime lock.
+    """
 
     request_id: str
     created_ms: int
-    event: threading.Event
+    event: threading.Event | None = None
     response: object | None = None
+    response_ready: bool = False
+
+    def reset(self, request_id: str, created_ms: int) -> "_PendingInteraction":
+        self.request_id = request_id
+        self.created_ms = created_ms
+        if self.event is not None:
+            self.event.clear()
+        self.response = None
+        self.response_ready = False
+        return self
 
 
 class VisualizerRuntime:
@@ -86,33 +310,84 @@ class VisualizerRuntime:
         self._port = port
         self._mode = (mode or "run").lower()
         self._pid = os.getpid()
-
-        self._lock = threading.RLock()
+        # Pre-encoded JSON fragments for the heartbeat fast path.
+        self._pid_bytes = str(self._pid).encode("ascii")
+        self._mode_bytes = _dumps(self._mode)
+
+        # Plain Lock: no locked section re-enters another (start() is invoked
+        # after set_active_graph releases the lock), and non-reentrant acquire
+        # skips RLock's owner/count bookkeeping on these hot, tiny sections.
+        self._lock = threading.Lock()
         self._thread: threading.Thread | None = None
         self._stop = threading.Event()
 
         self._connected = False
+        self._connected_event = threading.Event()
         self._subscribed = False
+        # True while a live consumer (debug session or subscriber) is attached;
+        # maintained by the writer thread. Lets trace entry points bail out
+        # before any payload work once history is saturated and nobody listens.
+        self._trace_active = False
 
         self._graph_name: str | None = None
         self._graph_payload: dict[str, object] | None = None
         self._graph_version = 0
+        # (version, payload, name) replaced wholesale on graph swap; the writer
+        # loop reads this tuple every tick without taking the lock (a single
+        # attribute load is atomic under the GIL and the tuple is immutable).
+        self._graph_state: tuple[int, dict[str, object] | None, str | None] = (0, None, None)
         self._last_sent_graph_version = -1
+        # Encoded HEARTBEAT payload, rebuilt only when the graph name changes.
+        # The payload (not the frame) is cached: client frames must carry a
+        # fresh mask per RFC 6455, and masking ~70 bytes is the cheap part.
+        self._heartbeat_payload: bytes | None = None
         self._root_entry_obj: object | None = None
         self._root_exit_obj: object | None = None
 
-        self._outq: "queue.Queue[dict[str, object]]" = queue.Queue(maxsize=5000)
-        self._history_events: list[dict[str, object]] = []
-        self._history_dropped = 0
-        self._history_truncated_fields = 0
+        # Outbound event queue, sharded by producer thread id so parallel
+        # node workers append to distinct deques (append/popleft are atomic
+        # under the GIL) instead of hammering one; a self-pipe wakes the
+        # writer's selector, and `_wake_pending` keeps producers to one wake
+        # syscall per writer nap. Per-thread ordering is preserved because a
+        # thread always lands in the same shard.
+        self._outq_shards: tuple[collections.deque, ...] = tuple(
+            collections.deque() for _ in range(4)
+        )
+        self._outq_max = 5000
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._wake_pending = False
+        # Monotonic sequence stamped on streamed events so the UI can order
+        # and gap-detect without comparing timestamps or run ids.
+        self._event_seq = itertools.count(1).__next__
+        # Run/interaction ids only need process-local uniqueness (the host
+        # scopes by pid from HELLO); counters beat uuid4 on the trace path.
+        self._run_id_counter = itertools.count(1).__next__
+        self._interact_id_counter = itertools.count(1).__next__
 
         # Tune: keep a bounded history so late subscribers can reconstruct execution state.
         self._history_max_events = 1200
+        self._history_events: collections.deque[dict[str, object]] = collections.deque(
+            maxlen=self._history_max_events
+        )
+        self._history_dropped = 0
+        self._history_truncated_fields = 0
         self._history_max_str = 5000
 
         # Human-in-the-loop interaction (request/response)
         self._pending_interactions: dict[str, _PendingInteraction] = {}
 
+        # Outbound bytes the non-blocking socket refused; flushed when the
+        # selector reports the socket writable again.
+        self._send_pending = bytearray()
+
+        # Freelists of recycled node-run contexts and interaction records (one
+        # alloc per node execution / request otherwise); list append/pop are
+        # atomic under the GIL.
+        self._ctx_pool: list[_NodeRunContext] = []
+        self._interaction_pool: list[_PendingInteraction] = []
+
     @property
     def mode(self) -> str:
         return self._mode
@@ -133,12 +408,7 @@ class VisualizerRuntime:
     def wait_connected(self, timeout_s: float = 2.0) -> bool:
         if timeout_s <= 0:
             return self.is_connected()
-        deadline = time.time() + float(timeout_s)
-        while time.time() < deadline:
-            if self.is_connected():
-                return True
-            time.sleep(0.05)
-        return self.is_connected()
+        return self._connected_event.wait(timeout=float(timeout_s))
 
     def request_interaction(
         self,
@@ -162,12 +432,12 @@ class VisualizerRuntime:
         if not self.wait_connected(timeout_s=2.0):
             return None
 
-        request_id = uuid.uuid4().hex
-        pending = _PendingInteraction(
-            request_id=request_id,
-            created_ms=_now_ms(),
-            event=threading.Event(),
-        )
+        request_id = f"i{self._pid}-{self._interact_id_counter():x}"
+        pool = self._interaction_pool
+        if pool:
+            pending = pool.pop().reset(request_id, _now_ms())
+        else:
+            pending = _PendingInteraction(request_id=request_id, created_ms=_now_ms())
         with self._lock:
             self._pending_interactions[request_id] = pending
 
@@ -186,78 +456,93 @@ class VisualizerRuntime:
             payload["meta"] = self._safe_for_history(meta)
 
         # Always enqueue interaction requests, even when not subscribed (run mode).
-        try:
-            self._outq.put(payload, timeout=0.2)
-        except queue.Full:
+        if not self._append_out(payload):
             with self._lock:
                 self._pending_interactions.pop(request_id, None)
             return None
 
-        if timeout_s is None:
-            pending.event.wait()
-        else:
-            pending.event.wait(timeout=float(timeout_s))
+        # Only arm the Event if the response has not already landed.
+        with self._lock:
+            ev = None
+            if not pending.response_ready:
+                ev = pending.event
+                if ev is None:
+                    ev = pending.event = threading.Event()
+        if ev is not None:
+            if timeout_s is None:
+                ev.wait()
+            else:
+                ev.wait(timeout=float(timeout_s))
 
         with self._lock:
             p = self._pending_interactions.pop(request_id, None)
         if not p:
             return None
-        if not p.event.is_set():
-            return None
-        return p.response
-
-    def _safe_for_history(self, value: object, *, depth: int = 5) -> object:
+        response = p.response if p.response_ready else None
+        # The response handler holds no reference past its locked set(); safe
+        # to recycle once popped.
+        if len(self._interaction_pool) < 32:
+            p.response = None
+            self._interaction_pool.append(p)
+        return response
+
+    def _safe_for_history(
+        self, value: object, *, depth: int = 5, budget: list[int] | None = None
+    ) -> object:
         """
         Best-effort JSON-friendly conversion with truncation to keep history bounded.
 
         - Limits recursion depth and container sizes.
         - Truncates long strings.
+        - Caps the cumulative string output of one top-level call (`budget`)
+          so a huge nested payload cannot expand into a multi-megabyte entry.
         - Falls back to str(value) when needed.
-        """
 
-        def _truncate(s: str) -> str:
-            if len(s) <= self._history_max_str:
-                return s
-            self._history_truncated_fields += 1
-            return s[: self._history_max_str] + "…(truncated)"
-
-        if value is None or isinstance(value, (int, float, bool)):
-            return value
-        if isinstance(value, str):
-            return _truncate(value)
-        if depth <= 0:
-            return _truncate(str(value))
-        if isinstance(value, dict):
-            out: dict[str, object] = {}
-            i = 0
+        The per-element work is table-dispatched on `type(value)` (see the
+        `_hist_*` handlers above the class); this method is the entry point
+        that adds the flat fast path and budget setup.
+        """
+        # Fast path for the dominant shape: a small, flat container of
+        # scalars with string keys and no oversized strings needs no copy,
+        # no recursion and no truncation — return it as-is.
+        max_str = self._history_max_str
+        if type(value) is dict and depth == 5 and len(value) <= 50:
             for k, v in value.items():
-                if i >= 50:
-                    self._history_truncated_fields += 1
-                    out["__masfactory_visualizer_truncated__"] = True
-                    out["__masfactory_visualizer_items__"] = i
+                if type(k) is not str or not (
+                    v is None
+                    or type(v) is int
+                    or type(v) is float
+                    or type(v) is bool
+                    or (type(v) is str and len(v) <= max_str)
+                ):
                     break
-                out[str(k)] = self._safe_for_history(v, depth=depth - 1)
-                i += 1
-            return out
-        if isinstance(value, (list, tuple, set)):
-            out_list: list[object] = []
-            for i, v in enumerate(value):
-                if i >= 50:
-                    self._history_truncated_fields += 1
-                    out_list.append("…(truncated)")
+            else:
+                return value
+        elif type(value) is list and depth == 5 and len(value) <= 50:
+            for v in value:
+                if not (
+                    v is None
+                    or type(v) is int
+                    or type(v) is float
+                    or type(v) is bool
+                    or (type(v) is str and len(v) <= max_str)
+                ):
                     break
-                out_list.append(self._safe_for_history(v, depth=depth - 1))
-            return out_list
-        return _truncate(str(value))
+            else:
+                return value
+
+        if budget is None:
+            budget = [8 * max_str]
+        fn = _HIST_DISPATCH.get(type(value), _hist_fallback)
+        return fn(self, value, depth, budget)
 
     def _record_history(self, msg: dict[str, object]) -> None:
         with self._lock:
-            self._history_events.append(msg)
-            if len(self._history_events) > self._history_max_events:
-                overflow = len(self._history_events) - self._history_max_events
-                if overflow > 0:
-                    self._history_events = self._history_events[overflow:]
-                    self._history_dropped += overflow
+            events = self._history_events
+            # A full deque evicts its oldest entry on append; count the drop.
+            if len(events) == self._history_max_events:
+                self._history_dropped += 1
+            events.append(msg)
 
     def _take_history_snapshot(self) -> tuple[list[dict[str, object]], int, int]:
         with self._lock:
@@ -308,24 +593,43 @@ class VisualizerRuntime:
             self._graph_name = graph_name
             self._graph_payload = payload
             self._graph_version += 1
+            self._graph_state = (self._graph_version, payload, graph_name)
+            self._heartbeat_payload = None
             # Keep a handle to RootGraph entry/exit for stable node id mapping ("entry"/"exit").
             self._root_entry_obj = getattr(root_graph, "_entry", None)
             self._root_exit_obj = getattr(root_graph, "_exit", None)
 
         self.start()
+        # A connected writer may be napping until its heartbeat deadline;
+        # nudge it so the new graph goes out promptly.
+        self._wake()
 
     def _resolve_node_id(self, node: object) -> str | None:
         if node is None:
             return None
+        # Memoized on the node itself, tagged with the graph version so graph
+        # swaps (which may remap entry/exit) recompute instead of going stale.
+        cached = getattr(node, "__masfactory_vid__", None)
+        if cached is not None and cached[0] == self._graph_version:
+            return cached[1]
         with self._lock:
             if self._root_entry_obj is not None and node is self._root_entry_obj:
-                return "entry"
-            if self._root_exit_obj is not None and node is self._root_exit_obj:
-                return "exit"
-        name = getattr(node, "name", None)
-        if isinstance(name, str) and name:
-            return name
-        return None
+                nid = "entry"
+            elif self._root_exit_obj is not None and node is self._root_exit_obj:
+                nid = "exit"
+            else:
+                nid = None
+        if nid is None:
+            name = getattr(node, "name", None)
+            if not isinstance(name, str) or not name:
+                return None
+            nid = name
+        try:
+            object.__setattr__(node, "__masfactory_vid__", (self._graph_version, nid))
+        except Exception:
+            # Slotted/frozen nodes just miss the cache.
+            pass
+        return nid
 
     def node_start(self, node: object, inputs: dict[str, object]) -> _NodeRunContext | None:
         """Record a node-start event.
@@ -338,12 +642,16 @@ class VisualizerRuntime:
             A `_NodeRunContext` used to later record end/error events, or `None` if the node
             cannot be resolved to a stable node id.
         """
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return None
         node_name = self._resolve_node_id(node)
         if not node_name:
             return None
 
         token_before_in = None
         token_before_out = None
+        tracker = None
         try:
             model = getattr(node, "model", None)
             tracker = getattr(model, "token_tracker", None) if model else None
@@ -352,8 +660,9 @@ class VisualizerRuntime:
         except Exception:
             token_before_in = None
             token_before_out = None
+            tracker = None
 
-        run_id = f"{self._pid}-{uuid.uuid4().hex[:10]}"
+        run_id = f"{self._pid}-{self._run_id_counter():x}"
         ts = _now_ms()
 
         payload: dict[str, object] = {
@@ -362,18 +671,27 @@ class VisualizerRuntime:
             "node": node_name,
             "ts": ts,
             "runId": run_id,
-            "inputs": self._safe_for_history(inputs if isinstance(inputs, dict) else {"input": inputs}),
         }
+        raw_inputs = inputs if isinstance(inputs, dict) else {"input": inputs}
+        # Streamed events are encoded at enqueue time (default=str catches the
+        # stragglers) and never stored, so the bounding walk only runs for
+        # events that actually land in history.
         if self.is_streaming():
+            payload["inputs"] = raw_inputs
             self._enqueue(payload)
         else:
+            payload["inputs"] = self._safe_for_history(raw_inputs)
             self._record_history(payload)
+        pool = self._ctx_pool
+        if pool:
+            return pool.pop().reset(node_name, run_id, ts, token_before_in, token_before_out, tracker)
         return _NodeRunContext(
             node_name=node_name,
             run_id=run_id,
             started_ms=ts,
             token_before_in=token_before_in,
             token_before_out=token_before_out,
+            tracker=tracker,
         )
 
     def node_end(self, ctx: _NodeRunContext | None, outputs: dict[str, object], node: object | None = None) -> None:
@@ -382,46 +700,58 @@ class VisualizerRuntime:
         Args:
             ctx: Context returned by `node_start()`. If None, this is a no-op.
             outputs: Output payload produced by the node.
-            node: Optional node instance used to extract token usage deltas.
+            node: Unused; kept for call-site compatibility. Token deltas are
+                read from the tracker captured on the context at start.
         """
         if not ctx:
             return
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return
 
-        metrics: dict[str, Any] = {}
-        if node is not None:
+        ended = _now_ms()
+        metrics: dict[str, Any] = {"duration_ms": max(0, ended - ctx.started_ms)}
+        tracker = ctx.tracker
+        if tracker is not None and ctx.token_before_in is not None and ctx.token_before_out is not None:
             try:
-                model = getattr(node, "model", None)
-                tracker = getattr(model, "token_tracker", None) if model else None
-                if tracker and ctx.token_before_in is not None and ctx.token_before_out is not None:
-                    after_in = int(getattr(tracker, "total_input_usage", 0))
-                    after_out = int(getattr(tracker, "total_output_usage", 0))
-                    din = max(0, after_in - ctx.token_before_in)
-                    dout = max(0, after_out - ctx.token_before_out)
-                    metrics["token_usage"] = {
-                        "prompt_tokens": din,
-                        "completion_tokens": dout,
-                        "total_tokens": din + dout,
-                    }
+                after_in = int(getattr(tracker, "total_input_usage", 0))
+                after_out = int(getattr(tracker, "total_output_usage", 0))
+                din = max(0, after_in - ctx.token_before_in)
+                dout = max(0, after_out - ctx.token_before_out)
+                metrics["token_usage"] = {
+                    "prompt_tokens": din,
+                    "completion_tokens": dout,
+                    "total_tokens": din + dout,
+                }
             except Exception:
                 pass
 
-        ended = _now_ms()
-        metrics["duration_ms"] = max(0, ended - ctx.started_ms)
-
         payload: dict[str, Any] = {
             "type": "NODE_EVENT",
             "event": "end",
             "node": ctx.node_name,
             "ts": ended,
             "runId": ctx.run_id,
-            "outputs": self._safe_for_history(outputs if isinstance(outputs, dict) else {"output": outputs}),
         }
-        if metrics:
-            payload["metrics"] = self._safe_for_history(metrics)
+        # Built locally from ints; already history-safe.
+        payload["metrics"] = metrics
+        raw_outputs = outputs if isinstance(outputs, dict) else {"output": outputs}
         if self.is_streaming():
+            payload["outputs"] = raw_outputs
             self._enqueue(payload)
         else:
+            payload["outputs"] = self._safe_for_history(raw_outputs)
             self._record_history(payload)
+        self._release_ctx(ctx)
+
+    def _release_ctx(self, ctx: object) -> None:
+        if (
+            isinstance(ctx, _NodeRunContext)
+            and not ctx.released
+            and len(self._ctx_pool) < _CTX_POOL_MAX
+        ):
+            ctx.released = True
+            self._ctx_pool.append(ctx)
 
     def node_error(self, ctx: _NodeRunContext | None, err: BaseException) -> None:
         """Record a node-error event.
@@ -432,18 +762,24 @@ class VisualizerRuntime:
         """
         if not ctx:
             return
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return
         payload = {
             "type": "NODE_EVENT",
             "event": "error",
             "node": ctx.node_name,
             "ts": _now_ms(),
             "runId": ctx.run_id,
-            "error": self._safe_for_history(f"{type(err).__name__}: {err}"),
         }
+        error_text = f"{type(err).__name__}: {err}"
         if self.is_streaming():
+            payload["error"] = error_text
             self._enqueue(payload)
         else:
+            payload["error"] = self._safe_for_history(error_text)
             self._record_history(payload)
+        self._release_ctx(ctx)
 
     def flow_edge_send(
         self,
@@ -461,6 +797,9 @@ class VisualizerRuntime:
             edge_keys: Optional edge key mapping (used to render key labels/details).
             message: Optional message payload snapshot.
         """
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return
         sender_id = self._resolve_node_id(sender)
         receiver_id = self._resolve_node_id(receiver)
         if not sender_id or not receiver_id:
@@ -500,6 +839,8 @@ class VisualizerRuntime:
         values: dict[str, object] | None = None,
         total_keys: int | None = None,
         truncated: bool = False,
+        base_version: int | None = None,
+        full: bool | None = None,
     ) -> None:
         """Record an attribute-pull flow event.
 
@@ -507,10 +848,16 @@ class VisualizerRuntime:
             node: Node performing the pull.
             scope: Optional scope label.
             keys: Pulled keys.
-            values: Optional sampled values for pulled keys.
+            values: Optional sampled values for pulled keys. When delta-encoded
+                by the client, only changed keys are present.
             total_keys: Total number of keys pulled when only a subset is included.
             truncated: Whether values were truncated for transport/history bounds.
+            base_version: Per-node snapshot version for delta-encoded values.
+            full: Whether `values` is a full snapshot (resync point).
         """
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return
         node_id = self._resolve_node_id(node)
         if not node_id:
             return
@@ -528,12 +875,23 @@ class VisualizerRuntime:
             payload["totalKeys"] = total_keys
         if truncated:
             payload["truncated"] = True
-        if isinstance(values, dict) and values:
-            payload["values"] = self._safe_for_history(values)
-
+        if isinstance(base_version, int):
+            payload["baseVersion"] = base_version
+            if full:
+                payload["full"] = True
+
+        if values is not None and not isinstance(values, dict):
+            # Lazy mapping passed by the hooks; materialize only once the
+            # trace/history gates above have let the event through.
+            values = dict(values)
+        has_values = isinstance(values, dict) and bool(values)
         if self.is_streaming():
+            if has_values:
+                payload["values"] = values
             self._enqueue(payload)
         else:
+            if has_values:
+                payload["values"] = self._safe_for_history(values)
             self._record_history(payload)
 
     def flow_attr_push(
@@ -544,20 +902,28 @@ class VisualizerRuntime:
         changes: dict[str, object] | None = None,
         total_keys: int | None = None,
         truncated: bool = False,
+        base_version: int | None = None,
+        full: bool | None = None,
     ) -> None:
         """Record an attribute-push flow event.
 
         Args:
             node: Node performing the push.
             scope: Optional scope label.
-            changes: Pushed key/value changes.
+            changes: Pushed key/value changes. When delta-encoded by the
+                client, only keys changed since the last event are present.
             total_keys: Total number of keys pushed when only a subset is included.
             truncated: Whether values were truncated for transport/history bounds.
+            base_version: Per-node snapshot version for delta-encoded changes.
+            full: Whether `changes` is a full snapshot (resync point).
         """
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return
         node_id = self._resolve_node_id(node)
         if not node_id:
             return
-        if not changes:
+        if not changes and not isinstance(base_version, int):
             return
 
         payload: dict[str, object] = {
@@ -565,7 +931,6 @@ class VisualizerRuntime:
             "kind": "ATTR_PUSH",
             "ts": _now_ms(),
             "node": node_id,
-            "changes": self._safe_for_history(changes),
         }
         if scope:
             payload["scope"] = scope
@@ -573,13 +938,34 @@ class VisualizerRuntime:
             payload["totalKeys"] = total_keys
         if truncated:
             payload["truncated"] = True
+        if isinstance(base_version, int):
+            payload["baseVersion"] = base_version
+            if full:
+                payload["full"] = True
 
+        raw_changes = changes if changes else {}
         if self.is_streaming():
+            payload["changes"] = raw_changes
             self._enqueue(payload)
         else:
+            payload["changes"] = self._safe_for_history(raw_changes)
             self._record_history(payload)
 
-    def log(self, level: str, message: str) -> None:
+    def log(self, level: str, message) -> None:
+        """Record a log event.
+
+        `message` may be a zero-arg callable for lazy formatting: it is only
+        invoked here, off the caller's hot path, when the event is actually
+        recorded.
+        """
+        if not self._trace_active and len(self._history_events) >= self._history_max_events:
+            self._history_dropped += 1
+            return
+        if callable(message):
+            try:
+                message = message()
+            except Exception:
+                message = ""
         payload = {
             "type": "LOG",
             "level": str(level or "info"),
@@ -622,27 +1008,151 @@ class VisualizerRuntime:
                 return False
 
         try:
-            self._outq.put(payload, timeout=max(0.0, float(enqueue_timeout_s)))
-            return True
+            return self._append_out(payload)
         except Exception:
             return False
 
-    def _enqueue(self, msg: dict[str, Any]) -> None:
-        try:
-            self._outq.put_nowait(msg)
-        except queue.Full:
+    def _append_out(self, msg: dict[str, Any]) -> bool:
+        shards = self._outq_shards
+        if len(shards[0]) + len(shards[1]) + len(shards[2]) + len(shards[3]) >= self._outq_max:
             # Drop to avoid blocking MASFactory execution.
+            return False
+        # Encode on the producer thread so the single IO thread only frames
+        # and writes. EDGE_SEND events stay dicts until drain time — they are
+        # the ones run-length coalescing merges.
+        if isinstance(msg, dict) and (
+            not _COALESCE_EDGE_SENDS or msg.get("kind") != "EDGE_SEND"
+        ):
+            try:
+                msg = _dumps(msg)
+            except Exception:
+                msg = _dumps(self._safe_for_history(msg))
+        shards[threading.get_ident() & 3].append(msg)
+        self._wake()
+        return True
+
+    def _wake(self) -> None:
+        """Nudge the writer's selector; at most one pipe byte per nap."""
+        if self._wake_pending:
+            return
+        self._wake_pending = True
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            # Pipe buffer full means wakes are already pending.
             pass
 
-    def _drain_outq(self, limit: int = 200) -> list[dict[str, Any]]:
-        items: list[dict[str, Any]] = []
-        for _ in range(limit):
-            try:
-                items.append(self._outq.get_nowait())
-            except queue.Empty:
+    def _drain_wake(self) -> None:
+        # Clear the flag before draining: a producer racing in after the
+        # clear leaves a byte behind and the next select wakes immediately.
+        self._wake_pending = False
+        try:
+            while self._wake_r.recv(1024):
+                pass
+        except OSError:
+            pass
+
+    def _enqueue(self, msg: dict[str, Any]) -> None:
+        msg["seq"] = self._event_seq()
+        self._append_out(msg)
+
+    # Assumed wire size for the few entries still queued as dicts (EDGE_SEND
+    # awaiting coalescing); real size is known only after encoding.
+    _DICT_SIZE_ESTIMATE = 256
+
+    def _drain_outq(
+        self, max_bytes: int = _BATCH_MAX_BYTES, max_count: int = 2000
+    ) -> list[bytes | dict[str, Any]]:
+        """Pop queued events until empty or a byte/count budget is hit.
+
+        Budgeting by bytes (cheap — entries are pre-encoded) keeps one drain
+        cycle from ballooning into an oversized write when payloads are large,
+        while letting tiny events batch far past the old fixed count.
+        Leftovers stay queued; the writer loop re-runs immediately while the
+        queue is non-empty.
+        """
+        items: list[bytes | dict[str, Any]] = []
+        size = 0
+        for shard in self._outq_shards:
+            popleft = shard.popleft
+            while len(items) < max_count and size < max_bytes:
+                try:
+                    item = popleft()
+                except IndexError:
+                    break
+                items.append(item)
+                size += len(item) if type(item) is bytes else self._DICT_SIZE_ESTIMATE
+            if len(items) >= max_count or size >= max_bytes:
                 break
         return items
 
+    def _flush_pending(self, sock: socket.socket) -> bool:
+        """Push buffered bytes out; True when the backlog fully drained."""
+        buf = self._send_pending
+        while buf:
+            try:
+                n = sock.send(buf)
+            except (BlockingIOError, InterruptedError):
+                return False
+            if n <= 0:
+                return False
+            del buf[:n]
+        return True
+
+    def _send_bytes(self, sock: socket.socket, data: bytes) -> None:
+        """Non-blocking send; short writes land in `_send_pending`."""
+        if self._send_pending:
+            self._send_pending += data
+            self._flush_pending(sock)
+            return
+        try:
+            n = sock.send(data)
+        except (BlockingIOError, InterruptedError):
+            n = 0
+        if n < len(data):
+            self._send_pending += data[n:]
+
+    def _send_events(self, sock: socket.socket, msgs: list[bytes | dict[str, Any]]) -> None:
+        """Write drained events as one coalesced frame per burst.
+
+        The writer loop wakes every ~20 ms, so events naturally accumulate in
+        `_outq` between iterations; sending them as a single
+        `{"type": "BATCH", "events": [...]}` frame turns N writes/syscalls per
+        tick into one. A lone event keeps its plain frame shape, and bursts are
+        split whenever the serialized batch would exceed `_BATCH_MAX_BYTES`.
+
+        Entries are already JSON bytes (encoded on the producer thread) except
+        EDGE_SEND dicts, which are coalesced here first.
+        """
+        if _COALESCE_EDGE_SENDS:
+            msgs = _coalesce_edge_sends(msgs)
+        encoded = [msg if type(msg) is bytes else _dumps(msg) for msg in msgs]
+        if len(encoded) == 1:
+            self._send_bytes(sock, ws_encode_text_frame(encoded[0]))
+            return
+        frames: list[bytes] = []
+        group: list[bytes] = []
+        group_size = 0
+        for item in encoded:
+            if group and group_size + len(item) > _BATCH_MAX_BYTES:
+                frames.append(self._encode_event_group(group))
+                group = []
+                group_size = 0
+            group.append(item)
+            group_size += len(item)
+        if group:
+            frames.append(self._encode_event_group(group))
+        # One syscall per drain cycle regardless of how many frames it took.
+        self._send_bytes(sock, b"".join(frames) if len(frames) > 1 else frames[0])
+
+    @staticmethod
+    def _encode_event_group(group: list[bytes]) -> bytes:
+        if len(group) == 1:
+            return ws_encode_text_frame(group[0])
+        # Events are already JSON-encoded; splice them into the envelope
+        # instead of decoding and re-encoding through a wrapper dict.
+        return ws_encode_text_frame(b'{"type":"BATCH","events":[' + b",".join(group) + b"]}")
+
     def _should_send_graph_now(self) -> bool:
         if self.is_debug():
             return True
@@ -654,84 +1164,126 @@ class VisualizerRuntime:
 
         while not self._stop.is_set():
             try:
-                with self._lock:
-                    host = self._host
-                    port = self._port
-                    mode = self._mode
-                    graph_name = self._graph_name or "unknown"
+                host = self._host
+                port = self._port
+                mode = self._mode
+                graph_name = self._graph_state[2] or "unknown"
                 sock = socket.create_connection((host, port), timeout=3)
+                sel = selectors.DefaultSelector()
                 try:
-                    ws_handshake(sock, host, port)
-                    sock.settimeout(0.05)
+                    handshake_rest = ws_handshake(sock, host, port)
+                    # Loopback connections (the normal case) skip masking:
+                    # zero-mask frames are copied out without the XOR pass.
+                    ws_set_trusted_peer(ws_peer_is_loopback(sock))
+                    sock.setblocking(False)
+                    self._send_pending.clear()
+                    sel.register(sock, selectors.EVENT_READ)
+                    sel.register(self._wake_r, selectors.EVENT_READ)
+                    write_registered = False
                     with self._lock:
                         self._connected = True
+                    self._connected_event.set()
+                    self._trace_active = self.is_debug()
 
-                    ws_send_text(
+                    self._send_bytes(
                         sock,
-                        json.dumps(
-                            {"type": "HELLO", "pid": self._pid, "graphName": graph_name, "mode": mode}
+                        ws_encode_text_frame(
+                            _dumps({"type": "HELLO", "pid": self._pid, "graphName": graph_name, "mode": mode})
                         ),
                     )
 
-                    buf = b""
+                    # Frames the server sent in the same burst as the
+                    # handshake response must not be lost.
+                    reader = WsReader()
+                    reader.feed(handshake_rest)
                     last_hb = 0.0
                     self._subscribed = False
                     reconnect_delay = 0.25
 
                     while not self._stop.is_set():
                         now = time.time()
-
-                        # Heartbeat (always)
-                        if now - last_hb >= 0.5:
-                            with self._lock:
-                                graph_name = self._graph_name or "unknown"
-                                mode = self._mode
-                            ws_send_text(
-                                sock,
-                                json.dumps(
-                                    {
-                                        "type": "HEARTBEAT",
-                                        "pid": self._pid,
-                                        "graphName": graph_name,
-                                        "mode": mode,
-                                    }
-                                ),
-                            )
-                            last_hb = now
-
-                        # Send queued messages
-                        for msg in self._drain_outq():
-                            ws_send_text(sock, json.dumps(msg, ensure_ascii=False, default=str))
-
-                        # Send graph lazily (run mode on subscribe; debug mode always)
-                        with self._lock:
-                            gv = self._graph_version
-                            payload = self._graph_payload
-                        if (
-                            payload is not None
+                        if self._send_pending:
+                            self._flush_pending(sock)
+                            if len(self._send_pending) > _SEND_PENDING_MAX:
+                                raise WebSocketError("send backlog exceeded")
+                        # Hold new events while a backlog is unflushed; the
+                        # queue keeps absorbing (and eventually dropping) them.
+                        pending = [] if self._send_pending else self._drain_outq()
+                        send_hb = now - last_hb >= 0.5
+                        gv, graph_payload, _ = self._graph_state
+                        send_graph = (
+                            graph_payload is not None
                             and gv != self._last_sent_graph_version
                             and self._should_send_graph_now()
-                        ):
-                            ws_send_text(sock, json.dumps({"type": "GRAPH", "graph": payload}))
-                            self._last_sent_graph_version = gv
-
-                        # Read inbound frames
-                        try:
-                            chunk = sock.recv(4096)
-                            if chunk:
-                                buf += chunk
-                        except socket.timeout:
-                            pass
+                        )
+
+                        if send_hb or pending or send_graph:
+                            # Cork so heartbeat, event batch and graph frames
+                            # written this tick leave as one segment train.
+                            with _cork(sock):
+                                if send_hb:
+                                    hb = self._heartbeat_payload
+                                    if hb is None:
+                                        # Splice pre-encoded fragments rather
+                                        # than serializing a dict; _dumps on
+                                        # the name handles JSON escaping.
+                                        hb = (
+                                            b'{"type":"HEARTBEAT","pid":'
+                                            + self._pid_bytes
+                                            + b',"graphName":'
+                                            + _dumps(self._graph_state[2] or "unknown")
+                                            + b',"mode":'
+                                            + self._mode_bytes
+                                            + b"}"
+                                        )
+                                        self._heartbeat_payload = hb
+                                    self._send_bytes(sock, ws_encode_text_frame(hb))
+                                    last_hb = now
+                                if pending:
+                                    self._send_events(sock, pending)
+                                if send_graph:
+                                    self._send_bytes(
+                                        sock,
+                                        ws_encode_text_frame(_dumps({"type": "GRAPH", "graph": graph_payload})),
+                                    )
+                                    self._last_sent_graph_version = gv
+
+                        # Block until the socket is readable (or writable
+                        # while a backlog is buffered), a producer wakes us,
+                        # or the heartbeat deadline arrives.
+                        want_write = bool(self._send_pending)
+                        if want_write != write_registered:
+                            sel.modify(
+                                sock,
+                                selectors.EVENT_READ
+                                | (selectors.EVENT_WRITE if want_write else 0),
+                            )
+                            write_registered = want_write
+                        timeout = max(0.0, last_hb + 0.5 - time.time())
+                        if not want_write and any(self._outq_shards):
+                            timeout = 0.0
+                        for key, mask in sel.select(timeout):
+                            if key.fileobj is self._wake_r:
+                                self._drain_wake()
+                                continue
+                            if mask & selectors.EVENT_WRITE:
+                                self._flush_pending(sock)
+                            if mask & selectors.EVENT_READ:
+                                try:
+                                    n = reader.recv_into(sock)
+                                except (BlockingIOError, InterruptedError):
+                                    continue
+                                if not n:
+                                    raise WebSocketError("server closed")
 
                         while True:
-                            decoded = ws_try_decode_frame(buf)
-                            if not decoded:
+                            frame = reader.next_frame()
+                            if frame is None:
                                 break
-                            frame, buf = decoded
                             if frame.opcode == 0x8:
                                 raise WebSocketError("server closed")
                             if frame.opcode == 0x9:
-                                ws_send_pong(sock, frame.payload)
+                                self._send_bytes(sock, ws_encode_frame(0xA, frame.payload))
                                 continue
                             if frame.opcode != 0x1:
                                 continue
@@ -745,24 +1297,26 @@ class VisualizerRuntime:
                                 # can reconstruct what happened before the user opened the view.
                                 was = self._subscribed
                                 self._subscribed = True
+                                self._trace_active = True
                                 if not was:
                                     events, dropped, truncated = self._take_history_snapshot()
                                     if events:
-                                        ws_send_text(
+                                        self._send_bytes(
                                             sock,
-                                            json.dumps(
-                                                {
-                                                    "type": "HISTORY",
-                                                    "events": events,
-                                                    "dropped": dropped,
-                                                    "truncated": truncated,
-                                                },
-                                                ensure_ascii=False,
-                                                default=str,
+                                            ws_encode_text_frame(
+                                                _dumps(
+                                                    {
+                                                        "type": "HISTORY",
+                                                        "events": events,
+                                                        "dropped": dropped,
+                                                        "truncated": truncated,
+                                                    }
+                                                )
                                             ),
                                         )
                             elif typ == "UNSUBSCRIBE":
                                 self._subscribed = False
+                                self._trace_active = self.is_debug()
                             elif typ == "INTERACT_RESPONSE":
                                 request_id = _as_str(msg.get("requestId") or msg.get("request_id"))
                                 if not request_id:
@@ -775,10 +1329,16 @@ class VisualizerRuntime:
                                     pending = self._pending_interactions.get(request_id)
                                     if pending is not None:
                                         pending.response = response
-                                        pending.event.set()
+                                        pending.response_ready = True
+                                        ev = pending.event
+                                        if ev is not None:
+                                            ev.set()
 
-                        time.sleep(0.02)
                 finally:
+                    try:
+                        sel.close()
+                    except Exception:
+                        pass
                     try:
                         ws_send_close(sock)
                     except Exception:
@@ -790,11 +1350,15 @@ class VisualizerRuntime:
                     with self._lock:
                         self._connected = False
                         self._subscribed = False
+                    self._connected_event.clear()
+                    self._trace_active = False
 
             except Exception:
                 with self._lock:
                     self._connected = False
                     self._subscribed = False
+                self._connected_event.clear()
+                self._trace_active = False
                 time.sleep(reconnect_delay)
                 reconnect_delay = min(2.0, reconnect_delay * 1.6)
 
@@ -802,6 +1366,19 @@ class VisualizerRuntime:
 _RUNTIME_SINGLETON: VisualizerRuntime | None = None
 
 
+def visualizer_trace_active() -> bool:
+    """Whether traced events are currently going anywhere.
+
+    True while a consumer is attached (debug session or subscriber) or while
+    the run-mode history buffer still has room. Call sites wrapping expensive
+    payload construction can gate on this before calling into the runtime.
+    """
+    rt = _RUNTIME_SINGLETON
+    if rt is None:
+        return False
+    return rt._trace_active or len(rt._history_events) < rt._history_max_events
+
+
 def get_visualizer_runtime() -> VisualizerRuntime | None:
     """Return (and lazily create) the process-global VisualizerRuntime singleton.
 
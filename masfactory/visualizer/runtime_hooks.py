@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-import json
+import re
+import weakref
+from collections.abc import Mapping
 from typing import Any, Callable, Protocol
 
 _VISUALIZER_STATE_ATTR = "_visualizer_runtime_hook_state"
@@ -31,7 +33,7 @@ class _VisualizerRuntimeLike(Protocol):
         *,
         scope: str | None = None,
         keys: list[str] | None = None,
-        values: dict[str, object] | None = None,
+        values: Mapping[str, object] | None = None,
         total_keys: int | None = None,
         truncated: bool = False,
     ) -> None: ...
@@ -46,18 +48,77 @@ class _VisualizerRuntimeLike(Protocol):
         truncated: bool = False,
     ) -> None: ...
 
-    def log(self, level: str, message: str) -> None: ...
+    def log(self, level: str, message: "str | Callable[[], str]") -> None: ...
+
+
+# Internal control nodes: bare entry/exit plus the generated *_entry/_exit/
+# _controller/_terminate helpers. One compiled scan replaces the chained
+# equality and endswith checks; callers hit this once per node via _meta.
+_INTERNAL_NAME_RE = re.compile(r"^(?:entry|exit)$|(?:_entry|_exit|_controller|_terminate)$")
 
 
 def _is_internal_control_node(node: object) -> bool:
-    name = node.name
-    if name in ("entry", "exit"):
-        return True
-    return name.endswith(("_entry", "_exit", "_controller", "_terminate"))
+    return _INTERNAL_NAME_RE.search(node.name) is not None
+
+
+class _LazyValues(Mapping):
+    """Read-through view of selected env keys, materialized only on demand.
+
+    `before_execute` hands this to `flow_attr_pull` instead of copying up to
+    60 values eagerly; consumers that drop the event behind their own gates
+    (client disabled, history saturated) never touch the environment. Keys
+    absent from the env are skipped, matching the old filtered copy.
+    """
+
+    __slots__ = ("_env", "_keys")
+
+    def __init__(self, env: Mapping[str, object], keys: list[str]) -> None:
+        self._env = env
+        self._keys = keys
+
+    def __getitem__(self, key: str) -> object:
+        return self._env[key]
+
+    def __iter__(self):
+        env = self._env
+        return (k for k in self._keys if k in env)
+
+    def __len__(self) -> int:
+        env = self._env
+        return sum(1 for k in self._keys if k in env)
+
+
+def _safe_hook(fn: Callable) -> Callable:
+    """Guard a `_VisualizerHooks` method: no-op without a runtime, never raise.
+
+    Applying the wrap once at class definition keeps the hook bodies
+    straight-line and puts the runtime-presence check in a single place.
+    """
+
+    def wrapper(self, *args, **kwargs):
+        if self.runtime is None:
+            return None
+        try:
+            return fn(self, *args, **kwargs)
+        except Exception:
+            return None
+
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+class _Truncated(Exception):
+    """Internal signal: the bounded preview writer hit its size cap."""
 
 
 class _Preview:
-    """Small helper for snapshotting values with truncation for UI/history."""
+    """Small helper for snapshotting values with truncation for UI/history.
+
+    Previews exist only for display and change-diffing, so the writer stops
+    as soon as `max_len` characters are accumulated instead of serializing
+    an arbitrarily large structure first and truncating afterwards.
+    """
 
     def __init__(self) -> None:
         self._missing = object()
@@ -69,13 +130,72 @@ class _Preview:
     def to_text(self, value: object, *, max_len: int = 1200) -> str:
         if value is self._missing:
             return "<missing>"
+        parts: list[str] = []
         try:
-            text = json.dumps(value, ensure_ascii=False, default=str)
+            self._write(value, parts, [max_len + 1])
+        except _Truncated:
+            return "".join(parts)[:max_len] + "…(truncated)"
         except Exception:
             text = str(value)
-        if len(text) <= max_len:
-            return text
-        return text[:max_len] + "…(truncated)"
+            if len(text) <= max_len:
+                return text
+            return text[:max_len] + "…(truncated)"
+        return "".join(parts)
+
+    @classmethod
+    def _write(cls, value: object, parts: list[str], remaining: list[int]) -> None:
+        """Append a JSON-ish rendering of `value`, aborting once over budget."""
+        t = type(value)
+        if t is dict:
+            cls._emit(parts, remaining, "{")
+            first = True
+            for k, v in value.items():
+                if not first:
+                    cls._emit(parts, remaining, ",")
+                first = False
+                cls._emit(parts, remaining, f'"{k}":')
+                cls._write(v, parts, remaining)
+            cls._emit(parts, remaining, "}")
+            return
+        if t is list or t is tuple:
+            cls._emit(parts, remaining, "[")
+            first = True
+            for v in value:
+                if not first:
+                    cls._emit(parts, remaining, ",")
+                first = False
+                cls._write(v, parts, remaining)
+            cls._emit(parts, remaining, "]")
+            return
+        if t is str:
+            cls._emit(parts, remaining, f'"{value}"')
+            return
+        # Scalars and arbitrary objects: str() matches the old default=str.
+        cls._emit(parts, remaining, str(value))
+
+    def fingerprint(self, value: object) -> int:
+        """Cheap change-detection token for snapshot/diff bookkeeping.
+
+        Hashable scalars are hashed directly (together with their type, so
+        `1` and `True` stay distinct); everything else hashes a bounded
+        preview. Only equality of fingerprints is meaningful — the snapshot
+        never needs the preview text itself, so nothing long-lived is kept
+        per key.
+        """
+        if value is self._missing:
+            return -1
+        t = type(value)
+        if t is str or t is int or t is float or t is bool or value is None:
+            return hash((t.__name__, value))
+        return hash(self.to_text(value, max_len=512))
+
+    @staticmethod
+    def _emit(parts: list[str], remaining: list[int], piece: str) -> None:
+        remaining[0] -= len(piece)
+        if remaining[0] <= 0:
+            parts.append(piece)
+            raise _Truncated
+        parts.append(piece)
 
 
 class _VisualizerHooks:
@@ -85,18 +205,40 @@ class _VisualizerHooks:
     Key design points:
     - No manual graph traversal here: we rely on `BaseGraph.hook_register(recursion=True)`.
     - Runtime can change: callbacks read `self.runtime` dynamically.
+    - No batching here: every `runtime.*` call is an in-process enqueue; the
+      writer thread already coalesces queued events into single BATCH frames,
+      so a second hook-side buffer would only add latency and re-entrancy
+      hazards (`node_start` must return its ctx synchronously).
     """
 
     def __init__(self) -> None:
         self.runtime: _VisualizerRuntimeLike | None = None
         self.BaseGraph: type | None = None
 
-        # Per-run transient state.
-        self._ctx_by_node_id: dict[int, list[object]] = {}
-        self._exec_ctx_by_node_id: dict[int, list[dict[str, Any]]] = {}
+        # Per-run transient state. Slots hold the ctx directly and are only
+        # promoted to a list when the same node is re-entered concurrently.
+        self._ctx_by_node_id: dict[int, object] = {}
+        self._exec_ctx_by_node_id: dict[int, object] = {}
         self._env_name_by_id: dict[int, str] = {}
+        # node -> (is_internal, pull_keys, push_keys, no_flow); node flow
+        # config is static per run, so hooks resolve it once per node. Weak
+        # keys mean a node GC'd mid-run cannot leave an entry behind for a
+        # new object that happens to reuse its id; nodes that do not support
+        # weak references (or hashing) fall back to the id-keyed dict.
+        self._meta_by_node: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._meta_fallback_by_id: dict[int, tuple[bool, Any, Any, bool]] = {}
+        # (id(sender), id(receiver)) -> edge, built lazily from out_edges.
+        self._edge_by_pair: dict[tuple[int, int], Any] = {}
+        # Free-lists for the per-execute ctx envelope and snapshot dicts;
+        # recycled in after_execute to keep the hot path allocation-free.
+        self._exec_ctx_pool: list[dict[str, Any]] = []
+        self._snapshot_pool: list[dict[str, int]] = []
+        self._exec_pool_max = 64
 
         self._preview = _Preview()
+        # Whether "info" log events are worth emitting at all; refreshed when
+        # a runtime is attached, True when the runtime does not say.
+        self._log_info_enabled = True
 
         # Stable callback identities used for registration.
         self.cb_before_forward = self.before_forward
@@ -111,199 +253,234 @@ class _VisualizerHooks:
         self._ctx_by_node_id.clear()
         self._exec_ctx_by_node_id.clear()
         self._env_name_by_id.clear()
+        self._meta_by_node.clear()
+        self._meta_fallback_by_id.clear()
+        self._edge_by_pair.clear()
+        self._exec_ctx_pool.clear()
+        self._snapshot_pool.clear()
 
-    def before_forward(self, node, input_dict, *args, **kwargs) -> None:
-        runtime = self.runtime
-        if runtime is None:
-            return
+    def _meta(self, node) -> tuple[bool, Any, Any, bool]:
         try:
-            ctx = runtime.node_start(node, input_dict)
-        except Exception:
-            return
+            meta = self._meta_by_node.get(node)
+        except TypeError:
+            meta = self._meta_fallback_by_id.get(id(node))
+        if meta is None:
+            pull_keys = node.pull_keys
+            push_keys = node.push_keys
+            # Explicitly-empty pull AND push means the node can never emit a
+            # flow event, so the execute hooks skip it entirely.
+            no_flow = pull_keys == {} and push_keys == {}
+            meta = (_is_internal_control_node(node), pull_keys, push_keys, no_flow)
+            try:
+                self._meta_by_node[node] = meta
+            except TypeError:
+                self._meta_fallback_by_id[id(node)] = meta
+        return meta
+
+    @staticmethod
+    def _push_slot(slots: dict[int, object], nid: int, ctx: object) -> None:
+        existing = slots.get(nid)
+        if existing is None:
+            slots[nid] = ctx
+        elif type(existing) is list:
+            existing.append(ctx)
+        else:
+            slots[nid] = [existing, ctx]
+
+    @staticmethod
+    def _pop_slot(slots: dict[int, object], nid: int) -> object | None:
+        existing = slots.get(nid)
+        if existing is None:
+            return None
+        if type(existing) is list:
+            ctx = existing.pop()
+            if not existing:
+                del slots[nid]
+            return ctx
+        del slots[nid]
+        return existing
+
+    def _release_exec_ctx(self, ctx: dict[str, Any]) -> None:
+        snapshot = ctx.get("snapshot")
+        ctx.clear()
+        if len(self._exec_ctx_pool) < self._exec_pool_max:
+            self._exec_ctx_pool.append(ctx)
+        if isinstance(snapshot, dict):
+            snapshot.clear()
+            if len(self._snapshot_pool) < self._exec_pool_max:
+                self._snapshot_pool.append(snapshot)
+
+    @_safe_hook
+    def before_forward(self, node, input_dict, *args, **kwargs) -> None:
+        ctx = self.runtime.node_start(node, input_dict)
         if ctx is None:
             return
-        self._ctx_by_node_id.setdefault(id(node), []).append(ctx)
+        self._push_slot(self._ctx_by_node_id, id(node), ctx)
 
+    @_safe_hook
     def after_forward(self, node, result, input_dict, *args, **kwargs) -> None:
-        runtime = self.runtime
-        if runtime is None:
-            return
-        stack = self._ctx_by_node_id.get(id(node))
-        if not stack:
+        ctx = self._pop_slot(self._ctx_by_node_id, id(node))
+        if ctx is None:
             return
-        ctx = stack.pop()
-        if not stack:
-            self._ctx_by_node_id.pop(id(node), None)
         output_dict = result if isinstance(result, dict) else {"output": result}
-        try:
-            runtime.node_end(ctx, output_dict, node=node)
-        except Exception:
-            return
+        self.runtime.node_end(ctx, output_dict, node=node)
 
+    @_safe_hook
     def error_forward(self, node, err, input_dict, *args, **kwargs) -> None:
-        runtime = self.runtime
-        if runtime is None:
-            return
-        stack = self._ctx_by_node_id.get(id(node))
-        ctx = stack.pop() if stack else None
-        if stack is not None and len(stack) == 0:
-            self._ctx_by_node_id.pop(id(node), None)
-        try:
-            runtime.node_error(ctx, err)
-        except Exception:
-            return
+        ctx = self._pop_slot(self._ctx_by_node_id, id(node))
+        self.runtime.node_error(ctx, err)
 
+    @_safe_hook
     def after_build(self, node, result, *args, **kwargs) -> None:
-        runtime = self.runtime
-        if runtime is None:
-            return
-        try:
-            name = node.name
-            typ = type(node).__name__
-            env = node.attributes
-            attr_count = len(env)
-            runtime.log("info", f"[build] node={name} type={typ} defaultAttrs={attr_count}")
-        except Exception:
+        if not self._log_info_enabled:
             return
-
+        name = node.name
+        typ = type(node).__name__
+        attr_count = len(node.attributes)
+        # Zero-arg callable: both runtime backends format lazily, so a build
+        # sweep over thousands of nodes pays no f-string cost for dropped logs.
+        self.runtime.log("info", lambda: f"[build] node={name} type={typ} defaultAttrs={attr_count}")
+
+    @_safe_hook
     def before_execute(self, node, outer_env, *args, **kwargs) -> None:
         """Hook: before Node.execute().
 
         Tracks attribute pulls and snapshots candidate push keys so `after_execute()` can compute
         and report attribute changes as a flow event.
         """
-        runtime = self.runtime
         base_graph_cls = self.BaseGraph
-        if runtime is None or base_graph_cls is None:
+        if base_graph_cls is None:
+            return
+        # Keep attribute-scope names for child events.
+        if isinstance(node, base_graph_cls):
+            env = node.attributes
+            self._env_name_by_id[id(env)] = node.name
             return
-        try:
-            # Keep attribute-scope names for child events.
-            if isinstance(node, base_graph_cls):
-                env = node.attributes
-                self._env_name_by_id[id(env)] = node.name
-                return
-
-            if _is_internal_control_node(node):
-                return
-
-            scope = self._env_name_by_id.get(id(outer_env))
 
-            pull_keys = node.pull_keys
-            pulled_keys: list[str] = []
-            pulled_values: dict[str, object] = {}
-            total_pull: int | None = None
-            truncated_pull = False
-
-            if pull_keys is None:
-                all_keys = list(outer_env.keys())
-                total_pull = len(all_keys)
-                pulled_keys = all_keys[:60]
-                truncated_pull = total_pull > len(pulled_keys)
-                pulled_values = {k: outer_env.get(k) for k in pulled_keys}
-            elif pull_keys:
-                pulled_keys = [str(k) for k in pull_keys.keys()]
-                total_pull = len(pulled_keys)
-                pulled_values = {k: outer_env.get(k) for k in pulled_keys if k in outer_env}
-
-            if pulled_keys:
-                runtime.flow_attr_pull(
-                    node,
-                    scope=scope,
-                    keys=pulled_keys,
-                    values=pulled_values,
-                    total_keys=total_pull,
-                    truncated=truncated_pull,
-                )
+        is_internal, pull_keys, push_keys, no_flow = self._meta(node)
+        if is_internal or no_flow:
+            return
 
-            push_keys = node.push_keys
-            candidate_keys: list[str] = []
-            if push_keys:
-                candidate_keys = [str(k) for k in push_keys.keys()]
-            elif push_keys is None:
-                if pull_keys:
-                    candidate_keys = [str(k) for k in pull_keys.keys()]
-                elif pull_keys is None:
-                    candidate_keys = [str(k) for k in outer_env.keys()]
-
-            if not candidate_keys:
-                return
-
-            total_push = len(candidate_keys)
-            sample_keys = candidate_keys[:120]
-            truncated_push = total_push > len(sample_keys)
-            snapshot = {k: self._preview.to_text(outer_env.get(k, self._preview.missing)) for k in sample_keys}
-            self._exec_ctx_by_node_id.setdefault(id(node), []).append(
-                {
-                    "scope": scope,
-                    "keys": sample_keys,
-                    "total": total_push,
-                    "truncated": bool(truncated_push),
-                    "snapshot": snapshot,
-                }
+        scope = self._env_name_by_id.get(id(outer_env))
+
+        pulled_keys: list[str] = []
+        total_pull: int | None = None
+        truncated_pull = False
+        env_keys: list[str] | None = None
+
+        if pull_keys is None:
+            env_keys = list(outer_env.keys())
+            total_pull = len(env_keys)
+            pulled_keys = env_keys[:60]
+            truncated_pull = total_pull > len(pulled_keys)
+        elif pull_keys:
+            pulled_keys = [str(k) for k in pull_keys.keys()]
+            total_pull = len(pulled_keys)
+
+        if pulled_keys:
+            self.runtime.flow_attr_pull(
+                node,
+                scope=scope,
+                keys=pulled_keys,
+                values=_LazyValues(outer_env, pulled_keys),
+                total_keys=total_pull,
+                truncated=truncated_pull,
             )
-        except Exception:
+
+        candidate_keys: list[str] = []
+        if push_keys:
+            candidate_keys = [str(k) for k in push_keys.keys()]
+        elif push_keys is None:
+            if pull_keys:
+                candidate_keys = [str(k) for k in pull_keys.keys()]
+            elif env_keys is not None:
+                # Reuse the key list materialized for the pull above instead
+                # of iterating the env a second time.
+                candidate_keys = [str(k) for k in env_keys]
+
+        if not candidate_keys:
             return
 
+        total_push = len(candidate_keys)
+        sample_keys = candidate_keys[:120]
+        truncated_push = total_push > len(sample_keys)
+        snapshot = self._snapshot_pool.pop() if self._snapshot_pool else {}
+        fingerprint = self._preview.fingerprint
+        missing = self._preview.missing
+        env_get = outer_env.get
+        for k in sample_keys:
+            snapshot[k] = fingerprint(env_get(k, missing))
+        ctx = self._exec_ctx_pool.pop() if self._exec_ctx_pool else {}
+        ctx["scope"] = scope
+        ctx["keys"] = sample_keys
+        ctx["total"] = total_push
+        ctx["truncated"] = bool(truncated_push)
+        ctx["snapshot"] = snapshot
+        self._push_slot(self._exec_ctx_by_node_id, id(node), ctx)
+
+    @_safe_hook
     def after_execute(self, node, result, outer_env, *args, **kwargs) -> None:
         """Hook: after Node.execute().
 
         Computes attribute changes relative to the snapshot captured by `before_execute()` and
         reports them as an attribute-push flow event.
         """
-        runtime = self.runtime
         base_graph_cls = self.BaseGraph
-        if runtime is None or base_graph_cls is None:
+        if base_graph_cls is None:
             return
-        try:
-            if isinstance(node, base_graph_cls):
-                return
-            if _is_internal_control_node(node):
-                return
-
-            stack = self._exec_ctx_by_node_id.get(id(node))
-            if not stack:
-                return
-            ctx = stack.pop()
-            if not stack:
-                self._exec_ctx_by_node_id.pop(id(node), None)
-
-            keys: list[str] = ctx.get("keys") or []
-            snapshot: dict[str, str] = ctx.get("snapshot") or {}
-            scope: str | None = ctx.get("scope")
-            total: int | None = ctx.get("total")
-            truncated: bool = bool(ctx.get("truncated"))
-
-            changes: dict[str, object] = {}
-            for k in keys:
-                before = snapshot.get(k, "<missing>")
-                after_v = outer_env.get(k, self._preview.missing)
-                after = self._preview.to_text(after_v)
-                if after != before:
-                    changes[k] = outer_env.get(k)
-
-            if not changes:
-                return
-            runtime.flow_attr_push(node, scope=scope, changes=changes, total_keys=total, truncated=truncated)
-        except Exception:
+        if isinstance(node, base_graph_cls):
             return
 
-    def edge_send(self, sender, receiver, message, *args, **kwargs) -> None:
-        runtime = self.runtime
-        if runtime is None:
+        # before_execute only records a ctx for nodes that passed its own
+        # gates, so a missing entry covers internal and no-flow nodes too.
+        ctx = self._pop_slot(self._exec_ctx_by_node_id, id(node))
+        if ctx is None:
             return
-        try:
-            edge_obj = None
+
+        keys: list[str] = ctx.get("keys") or []
+        snapshot: dict[str, int] = ctx.get("snapshot") or {}
+        scope: str | None = ctx.get("scope")
+        total: int | None = ctx.get("total")
+        truncated: bool = bool(ctx.get("truncated"))
+
+        changes: dict[str, object] = {}
+        fingerprint = self._preview.fingerprint
+        missing = self._preview.missing
+        missing_fp = fingerprint(missing)
+        snap_get = snapshot.get
+        env_get = outer_env.get
+        for k in keys:
+            after_v = env_get(k, missing)
+            if fingerprint(after_v) != snap_get(k, missing_fp):
+                changes[k] = env_get(k)
+
+        self._release_exec_ctx(ctx)
+        if not changes:
+            return
+        self.runtime.flow_attr_push(node, scope=scope, changes=changes, total_keys=total, truncated=truncated)
+
+    @_safe_hook
+    def edge_send(self, sender, receiver, message, *args, **kwargs) -> None:
+        pair = (id(sender), id(receiver))
+        edge_obj = self._edge_by_pair.get(pair)
+        if edge_obj is None and pair not in self._edge_by_pair:
             for e in sender.out_edges:
                 if e.receiver is receiver:
                     edge_obj = e
                     break
-            edge_keys = edge_obj.keys if edge_obj is not None else None
-            msg = (
-                {k: message[k] for k in edge_keys.keys()} if edge_keys is not None else {}
-            )
-            runtime.flow_edge_send(sender, receiver, edge_keys=edge_keys, message=msg)
-        except Exception:
-            return
+            # Topology is fixed per run; remember misses too so fan-out
+            # scans are not repeated for edges that do not exist.
+            self._edge_by_pair[pair] = edge_obj
+        edge_keys = edge_obj.keys if edge_obj is not None else None
+        if edge_keys is None:
+            msg = {}
+        elif edge_keys.keys() == message.keys():
+            # Common case: the message carries exactly the edge keys, so
+            # forward it as-is instead of rebuilding an identical dict.
+            msg = message
+        else:
+            msg = {k: message[k] for k in edge_keys.keys() if k in message}
+        self.runtime.flow_edge_send(sender, receiver, edge_keys=edge_keys, message=msg)
 
     def install(self, root_graph: object) -> None:
         """
@@ -393,6 +570,10 @@ def install_root_graph_runtime_hooks(root_graph: object, runtime: object) -> Non
 
     handler.runtime = runtime  # type: ignore[assignment]
     handler.BaseGraph = BaseGraph  # type: ignore[assignment]
+    try:
+        handler._log_info_enabled = bool(runtime.is_log_level_enabled("info"))  # type: ignore[attr-defined]
+    except Exception:
+        handler._log_info_enabled = True
     handler.reset_run_state()
     try:
         handler.install(root_graph)
@@ -421,4 +602,8 @@ def reset_root_graph_runtime_hooks(root_graph: object, runtime: object) -> None:
 
     handler.runtime = runtime  # type: ignore[assignment]
     handler.BaseGraph = BaseGraph  # type: ignore[assignment]
+    try:
+        handler._log_info_enabled = bool(runtime.is_log_level_enabled("info"))  # type: ignore[attr-defined]
+    except Exception:
+        handler._log_info_enabled = True
     handler.reset_run_state()
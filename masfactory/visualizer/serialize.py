@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import functools
 import inspect
 import os
-from typing import Any
+from typing import Any, Protocol
 
 
 def _keys_semantics(value: object) -> dict[str, str] | None | str | None:
@@ -21,17 +22,97 @@ def _keys_semantics(value: object) -> dict[str, str] | None | str | None:
     return None
 
 
+@functools.lru_cache(maxsize=2048)
+def _source_location(target: object) -> tuple[str | None, int | None]:
+    """Resolve (abspath, first line) for a class or function, memoized.
+
+    Many nodes share the same class or forward function, and
+    `inspect.getsourcelines` re-reads and scans the source file on every
+    call; caching per target makes repeat lookups a dict hit. The cache is
+    bounded and keyed on the object itself (classes/functions are hashable
+    and long-lived).
+    """
+    file_path: str | None
+    try:
+        file_path = inspect.getsourcefile(target) or inspect.getfile(target)
+    except Exception:
+        file_path = None
+    if file_path:
+        try:
+            file_path = os.path.abspath(file_path)
+        except Exception:
+            pass
+
+    line: int | None
+    try:
+        _lines, line = inspect.getsourcelines(target)
+        if not isinstance(line, int) or line <= 0:
+            line = None
+    except Exception:
+        line = None
+
+    return file_path, line
+
+
+_SEQ_TYPES = (list, tuple, set)
+
+
 def _safe_obj(value: object) -> object:
-    # Best-effort JSON-friendly conversion.
-    if value is None:
-        return None
-    if isinstance(value, (str, int, float, bool)):
+    # Best-effort JSON-friendly conversion. Leaves (the overwhelmingly common
+    # case) return immediately; containers are converted with an explicit work
+    # stack instead of recursion, so wide/deep attribute trees do not pay one
+    # Python frame per element.
+    t = type(value)
+    if t is str or t is int or t is float or t is bool or value is None:
         return value
     if isinstance(value, dict):
-        return {str(k): _safe_obj(v) for k, v in value.items()}
-    if isinstance(value, (list, tuple, set)):
-        return [_safe_obj(v) for v in value]
-    return str(value)
+        out: object = {}
+    elif isinstance(value, _SEQ_TYPES):
+        out = []
+    elif isinstance(value, (str, int, float, bool)):
+        return value
+    else:
+        return str(value)
+
+    stack: list[tuple[object, object]] = [(value, out)]
+    while stack:
+        src, dst = stack.pop()
+        if isinstance(src, dict):
+            for k, v in src.items():
+                k = str(k)
+                tv = type(v)
+                if tv is str or tv is int or tv is float or tv is bool or v is None:
+                    dst[k] = v
+                elif isinstance(v, dict):
+                    child: object = {}
+                    dst[k] = child
+                    stack.append((v, child))
+                elif isinstance(v, _SEQ_TYPES):
+                    child = []
+                    dst[k] = child
+                    stack.append((v, child))
+                elif isinstance(v, (str, int, float, bool)):
+                    dst[k] = v
+                else:
+                    dst[k] = str(v)
+        else:
+            for v in src:
+                tv = type(v)
+                if tv is str or tv is int or tv is float or tv is bool or v is None:
+                    dst.append(v)
+                elif isinstance(v, dict):
+                    child = {}
+                    dst.append(child)
+                    stack.append((v, child))
+                elif isinstance(v, _SEQ_TYPES):
+                    child = []
+                    dst.append(child)
+                    stack.append((v, child))
+                elif isinstance(v, (str, int, float, bool)):
+                    dst.append(v)
+                else:
+                    dst.append(str(v))
+    return out
 
 
 @dataclass
@@ -41,16 +122,31 @@ class SerializedGraph:
     graph: dict[str, object]
 
 
-def serialize_root_graph(root) -> SerializedGraph:
+class SerializeWriter(Protocol):
+    """Callback sink for `serialize_root_graph_stream()`.
+
+    Consumers that forward the graph to a file/socket can implement this to
+    receive nodes and edges as the walk discovers them instead of holding the
+    whole payload dict in memory. `info` carries the optional per-node fields
+    (aliases, filePath, lineNumber, pullKeys, pushKeys, attributes, inputKeys,
+    outputKeys, instructions, promptTemplate) keyed as in the dict payload.
     """
-    Serialize an in-memory MASFactory RootGraph into the same *shape* used by MASFactory
-    Visualizer's
-    static parser output (GraphData-ish):
 
-    - nodes/nodeTypes/edges/subgraphs/subgraphTypes/subgraphParents
-    - nodePullKeys/nodePushKeys/nodeAttributes
-    - nodeInputKeys/nodeOutputKeys (from edges)
-    - nodeInstructions/nodePromptTemplates (Agent-only, best-effort)
+    def on_node(self, nid: str, node_type: str, info: dict[str, object]) -> None: ...
+
+    def on_edge(self, from_id: str, to_id: str, keys_details: dict[str, object] | None) -> None: ...
+
+    def on_subgraph(self, parent: str, child: str) -> None: ...
+
+    def on_subgraph_type(self, nid: str, kind: str) -> None: ...
+
+
+def serialize_root_graph_stream(root, writer: SerializeWriter) -> None:
+    """Walk a RootGraph and emit nodes/edges through `writer` as discovered.
+
+    This is the streaming core behind `serialize_root_graph()`: nothing is
+    accumulated here beyond the dedup bookkeeping, so peak memory is bounded
+    by the largest single node record rather than the whole graph.
     """
 
     # Lazy imports to avoid circular deps at import time.
@@ -59,24 +155,6 @@ def serialize_root_graph(root) -> SerializedGraph:
     from masfactory.components.graphs.loop import Loop
     from masfactory.components.agents.agent import Agent
 
-    nodes: list[str] = []
-    node_types: dict[str, str] = {}
-    edges: list[dict[str, object]] = []
-    subgraphs: dict[str, list[str]] = {}
-    subgraph_types: dict[str, str] = {}
-    subgraph_parents: dict[str, str] = {}
-
-    node_pull_keys: dict[str, object] = {}
-    node_push_keys: dict[str, object] = {}
-    node_attributes: dict[str, object] = {}
-    node_input_keys: dict[str, object] = {}
-    node_output_keys: dict[str, object] = {}
-    node_instructions: dict[str, str] = {}
-    node_prompt_templates: dict[str, str] = {}
-    node_line_numbers: dict[str, int] = {}
-    node_file_paths: dict[str, str] = {}
-    node_aliases: dict[str, list[str]] = {}
-
     # RootGraph entry/exit should be displayed as "entry"/"exit" for UX consistency.
     root_entry = getattr(root, "_entry", None)
     root_exit = getattr(root, "_exit", None)
@@ -133,73 +211,68 @@ def serialize_root_graph(root) -> SerializedGraph:
         except Exception:
             target = node.__class__
 
-        file_path: str | None
         try:
-            file_path = inspect.getsourcefile(target) or inspect.getfile(target)
-        except Exception:
-            file_path = None
-        if file_path:
-            try:
-                file_path = os.path.abspath(file_path)
-            except Exception:
-                pass
-
-        line: int | None
-        try:
-            _lines, line = inspect.getsourcelines(target)
-            if not isinstance(line, int) or line <= 0:
-                line = None
-        except Exception:
-            line = None
-
-        return file_path, line
+            return _source_location(target)
+        except TypeError:
+            # Unhashable target; fall back to an uncached lookup.
+            return _source_location.__wrapped__(target)
+
+    # ensure_node is re-entered for the same node from the internal-node,
+    # child and edge passes; resolve its id once per node instance.
+    nid_by_obj: dict[int, str] = {}
+    emitted: set[str] = set()
+    # Membership dedup: the edge pass revisits both endpoints of every edge.
+    subgraph_members: dict[str, set[str]] = {}
 
     def ensure_node(node, *, parent: str | None = None) -> str:
-        nid = node_id(node)
-        if nid not in node_types:
-            nodes.append(nid)
+        nid = nid_by_obj.get(id(node))
+        if nid is None:
+            nid = node_id(node)
+            nid_by_obj[id(node)] = nid
+        if nid not in emitted:
+            emitted.add(nid)
             resolved_type = node_type(node)
-            node_types[nid] = resolved_type
+            info: dict[str, object] = {}
 
             # Human-friendly aliases for internal control nodes.
             if resolved_type == "entry":
-                node_aliases[nid] = ["entry"]
+                info["aliases"] = ["entry"]
             elif resolved_type == "exit":
-                node_aliases[nid] = ["exit"]
+                info["aliases"] = ["exit"]
             elif resolved_type == "Controller":
-                node_aliases[nid] = ["controller"]
+                info["aliases"] = ["controller"]
             elif resolved_type == "TerminateNode":
-                node_aliases[nid] = ["terminate"]
+                info["aliases"] = ["terminate"]
 
             try:
                 fp, ln = _source_info(node)
                 if fp:
-                    node_file_paths[nid] = fp
+                    info["filePath"] = fp
                 if ln is not None:
-                    node_line_numbers[nid] = ln
+                    info["lineNumber"] = ln
             except Exception:
                 pass
 
             pull = _keys_semantics(getattr(node, "_pull_keys", None))
             push = _keys_semantics(getattr(node, "_push_keys", None))
             if pull is not None:
-                node_pull_keys[nid] = pull
+                info["pullKeys"] = pull
             if push is not None:
-                node_push_keys[nid] = push
+                info["pushKeys"] = push
 
             # Prefer _default_attributes snapshot (this matches what the node actually uses).
             default_attrs = getattr(node, "_default_attributes", None)
             if isinstance(default_attrs, dict):
-                node_attributes[nid] = _safe_obj(default_attrs)
+                info["attributes"] = _safe_obj(default_attrs)
 
             # Message keys on edges (input/output)
             try:
                 in_keys = getattr(node, "input_keys", None)
                 out_keys = getattr(node, "output_keys", None)
                 if isinstance(in_keys, dict) and len(in_keys) > 0:
-                    node_input_keys[nid] = _safe_obj(in_keys)
+                    info["inputKeys"] = _safe_obj(in_keys)
                 if isinstance(out_keys, dict) and len(out_keys) > 0:
-                    node_output_keys[nid] = _safe_obj(out_keys)
+                    info["outputKeys"] = _safe_obj(out_keys)
             except Exception:
                 pass
 
@@ -207,23 +280,25 @@ def serialize_root_graph(root) -> SerializedGraph:
                 try:
                     ins = getattr(node, "instructions", None)
                     if isinstance(ins, str) and ins.strip():
-                        node_instructions[nid] = ins
+                        info["instructions"] = ins
                 except Exception:
                     pass
                 try:
                     tmpl = getattr(node, "_prompt_template", None)
                     if isinstance(tmpl, str) and tmpl.strip():
-                        node_prompt_templates[nid] = tmpl
+                        info["promptTemplate"] = tmpl
                     elif isinstance(tmpl, list) and tmpl:
-                        node_prompt_templates[nid] = "\n".join(str(x) for x in tmpl)
+                        info["promptTemplate"] = "\n".join(str(x) for x in tmpl)
                 except Exception:
                     pass
 
+            writer.on_node(nid, resolved_type, info)
+
         if parent:
-            subgraphs.setdefault(parent, [])
-            if nid not in subgraphs[parent]:
-                subgraphs[parent].append(nid)
-            subgraph_parents[nid] = parent
+            members = subgraph_members.setdefault(parent, set())
+            if nid not in members:
+                members.add(nid)
+                writer.on_subgraph(parent, nid)
 
         return nid
 
@@ -264,11 +339,11 @@ def serialize_root_graph(root) -> SerializedGraph:
             graph_node_id = ensure_node(g, parent=parent)
             # Best-effort label for graph containers.
             if isinstance(g, Loop):
-                subgraph_types[graph_node_id] = "Loop"
+                writer.on_subgraph_type(graph_node_id, "Loop")
             elif isinstance(g, Graph):
-                subgraph_types[graph_node_id] = "Graph"
+                writer.on_subgraph_type(graph_node_id, "Graph")
             else:
-                subgraph_types[graph_node_id] = type(g).__name__
+                writer.on_subgraph_type(graph_node_id, type(g).__name__)
 
         # Internal nodes (entry/exit or controller/terminate)
         internal_nodes: list[Any] = []
@@ -281,9 +356,12 @@ def serialize_root_graph(root) -> SerializedGraph:
         for n in internal_nodes:
             ensure_node(n, parent=graph_node_id if graph_node_id else parent)
 
-        # Direct child nodes
+        # Direct child nodes; nested graphs/loops recurse in the same pass.
+        child_parent = graph_node_id if graph_node_id else parent
         for n in _iter_child_nodes(g):
-            ensure_node(n, parent=graph_node_id if graph_node_id else parent)
+            ensure_node(n, parent=child_parent)
+            if isinstance(n, BaseGraph):
+                walk_graph(n, parent=child_parent, is_root=False)
 
         # Edges inside this graph container
         for e in getattr(g, "_edges", []) or []:
@@ -291,46 +369,162 @@ def serialize_root_graph(root) -> SerializedGraph:
             receiver = getattr(e, "_receiver", None)
             if sender is None or receiver is None:
                 continue
-            from_id = ensure_node(sender, parent=graph_node_id if graph_node_id else parent)
-            to_id = ensure_node(receiver, parent=graph_node_id if graph_node_id else parent)
+            from_id = ensure_node(sender, parent=child_parent)
+            to_id = ensure_node(receiver, parent=child_parent)
             keys = getattr(e, "keys", None)
-            edge_obj: dict[str, object] = {"from": from_id, "to": to_id}
-            if isinstance(keys, dict) and len(keys) > 0:
-                edge_obj["keysDetails"] = _safe_obj(keys)
-            edges.append(edge_obj)
-
-        # Recurse into nested graphs/loops
-        for n in _iter_child_nodes(g):
-            if isinstance(n, BaseGraph):
-                walk_graph(n, parent=graph_node_id if graph_node_id else parent, is_root=False)
+            keys_details = _safe_obj(keys) if isinstance(keys, dict) and len(keys) > 0 else None
+            writer.on_edge(from_id, to_id, keys_details)
 
     # Root: we do not render it as a graph node, but still include its entry/exit + edges.
     ensure_node(root_entry)
     ensure_node(root_exit)
     walk_graph(root, parent=None, is_root=True)
 
-    graph_payload: dict[str, object] = {
-        "nodes": nodes,
-        "nodeTypes": node_types,
-        "edges": edges,
-        "subgraphs": subgraphs,
-        "subgraphTypes": subgraph_types,
-        "subgraphParents": subgraph_parents,
-        "nodeLineNumbers": node_line_numbers,
-        "nodeFilePaths": node_file_paths,
-        "nodePullKeys": node_pull_keys,
-        "nodePushKeys": node_push_keys,
-        "nodeAttributes": node_attributes,
+
+class _GraphDictWriter:
+    """SerializeWriter that accumulates the classic GraphData-ish payload."""
+
+    _INFO_MAPS = {
+        "aliases": "nodeAliases",
+        "filePath": "nodeFilePaths",
+        "lineNumber": "nodeLineNumbers",
+        "pullKeys": "nodePullKeys",
+        "pushKeys": "nodePushKeys",
+        "attributes": "nodeAttributes",
+        "inputKeys": "nodeInputKeys",
+        "outputKeys": "nodeOutputKeys",
+        "instructions": "nodeInstructions",
+        "promptTemplate": "nodePromptTemplates",
     }
-    if node_aliases:
-        graph_payload["nodeAliases"] = node_aliases
-    if node_input_keys:
-        graph_payload["nodeInputKeys"] = node_input_keys
-    if node_output_keys:
-        graph_payload["nodeOutputKeys"] = node_output_keys
-    if node_instructions:
-        graph_payload["nodeInstructions"] = node_instructions
-    if node_prompt_templates:
-        graph_payload["nodePromptTemplates"] = node_prompt_templates
-
-    return SerializedGraph(graph=graph_payload)
+
+    def __init__(self) -> None:
+        self.nodes: list[str] = []
+        self.node_types: dict[str, str] = {}
+        self.edges: list[dict[str, object]] = []
+        self.subgraphs: dict[str, list[str]] = {}
+        self.subgraph_types: dict[str, str] = {}
+        self.subgraph_parents: dict[str, str] = {}
+        self.info_maps: dict[str, dict[str, object]] = {name: {} for name in self._INFO_MAPS.values()}
+
+    def on_node(self, nid: str, node_type: str, info: dict[str, object]) -> None:
+        self.nodes.append(nid)
+        self.node_types[nid] = node_type
+        for field, map_name in self._INFO_MAPS.items():
+            if field in info:
+                self.info_maps[map_name][nid] = info[field]
+
+    def on_edge(self, from_id: str, to_id: str, keys_details: dict[str, object] | None) -> None:
+        edge_obj: dict[str, object] = {"from": from_id, "to": to_id}
+        if keys_details is not None:
+            edge_obj["keysDetails"] = keys_details
+        self.edges.append(edge_obj)
+
+    def on_subgraph(self, parent: str, child: str) -> None:
+        self.subgraphs.setdefault(parent, []).append(child)
+        self.subgraph_parents[child] = parent
+
+    def on_subgraph_type(self, nid: str, kind: str) -> None:
+        self.subgraph_types[nid] = kind
+
+    def payload(self) -> dict[str, object]:
+        info = self.info_maps
+        graph_payload: dict[str, object] = {
+            "nodes": self.nodes,
+            "nodeTypes": self.node_types,
+            "edges": self.edges,
+            "subgraphs": self.subgraphs,
+            "subgraphTypes": self.subgraph_types,
+            "subgraphParents": self.subgraph_parents,
+            "nodeLineNumbers": info["nodeLineNumbers"],
+            "nodeFilePaths": info["nodeFilePaths"],
+            "nodePullKeys": info["nodePullKeys"],
+            "nodePushKeys": info["nodePushKeys"],
+            "nodeAttributes": info["nodeAttributes"],
+        }
+        for map_name in ("nodeAliases", "nodeInputKeys", "nodeOutputKeys", "nodeInstructions", "nodePromptTemplates"):
+            if info[map_name]:
+                graph_payload[map_name] = info[map_name]
+        return graph_payload
+
+
+def serialize_root_graph(root) -> SerializedGraph:
+    """
+    Serialize an in-memory MASFactory RootGraph into the same *shape* used by MASFactory
+    Visualizer's
+    static parser output (GraphData-ish):
+
+    - nodes/nodeTypes/edges/subgraphs/subgraphTypes/subgraphParents
+    - nodePullKeys/nodePushKeys/nodeAttributes
+    - nodeInputKeys/nodeOutputKeys (from edges)
+    - nodeInstructions/nodePromptTemplates (Agent-only, best-effort)
+
+    Thin wrapper over `serialize_root_graph_stream()` with a dict-collecting
+    writer.
+    """
+    writer = _GraphDictWriter()
+    serialize_root_graph_stream(root, writer)
+    return SerializedGraph(graph=writer.payload())
+
+
+# ExtType code tagging an interned-string reference in the packed graph
+# format. A bare integer index would be indistinguishable from a genuine int
+# leaf (line numbers, int-valued user attributes) in the same position.
+_PACKED_STR_EXT = 1
+
+
+def serialize_root_graph_packed(root) -> bytes:
+    """Serialize a RootGraph to a compact MessagePack buffer.
+
+    Node ids, type names and key strings repeat heavily in the dict payload
+    (`nodes`, `nodeTypes`, `edges`, `subgraphs` all spell them out), so this
+    variant interns every string into a dedup table and replaces occurrences
+    with ExtType-tagged indices before packing:
+
+        {"strings": [s0, s1, ...], "graph": <str -> ExtType(1, index)>}
+
+    The ExtType tag keeps references distinct from genuine integer leaves,
+    so the buffer round-trips with no schema knowledge:
+
+        def _ext(code, data):
+            return strings[int.from_bytes(data, "big")]
+
+        decoded = msgpack.unpackb(buf, ext_hook=_ext, strict_map_key=False)
+
+    (`strict_map_key=False` because dict keys are references too.)
+    The JSON-shaped `serialize_root_graph()` remains the compatibility path;
+    this one needs the optional `msgpack` dependency (visualizer extra).
+
+    Raises:
+        ImportError: If `msgpack` is not installed.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("msgpack is not installed. Please install it using 'pip install msgpack'")
+
+    graph = serialize_root_graph(root).graph
+
+    strings: list[str] = []
+    string_refs: dict[str, msgpack.ExtType] = {}
+
+    def intern(s: str) -> "msgpack.ExtType":
+        ref = string_refs.get(s)
+        if ref is None:
+            sid = len(strings)
+            strings.append(s)
+            ref = string_refs[s] = msgpack.ExtType(
+                _PACKED_STR_EXT, sid.to_bytes((sid.bit_length() + 7) // 8 or 1, "big")
+            )
+        return ref
+
+    def pack_value(value: object) -> object:
+        if type(value) is str:
+            return intern(value)
+        if isinstance(value, dict):
+            return {intern(str(k)): pack_value(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [pack_value(v) for v in value]
+        return value
+
+    packed_graph = pack_value(graph)
+    return msgpack.packb({"strings": strings, "graph": packed_graph}, use_bin_type=True)